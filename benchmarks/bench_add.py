@@ -0,0 +1,95 @@
+# benchmarks/bench_add.py
+#
+# Times adding a batch of transactions with add_transactions() against looping the
+# single-add path (a budget alert check and record_transaction() per row, as the CLI's
+# `add` does), on top of a synthetic ledger. Both must leave identical ledger files.
+# Run from the project root: python -m benchmarks.bench_add [batch sizes ...]
+
+import os
+import random
+import sys
+import tempfile
+import time
+from benchmarks.common import synthetic_lines
+from utils.constants import EXPENSE_CATEGORIES, INCOME_CATEGORIES
+
+PROJECT_ROOT = os.getcwd()
+BASE_ROWS = 100_000
+
+
+def _batch(size, seed=7):
+    """Returns `size` export records dated this month."""
+    rng = random.Random(seed)
+    today = time.strftime("%Y-%m-%d")
+    batch = []
+    for _ in range(size):
+        if rng.random() < 0.8:
+            type, category = "expense", rng.choice(EXPENSE_CATEGORIES)
+        else:
+            type, category = "income", rng.choice(INCOME_CATEGORIES)
+        batch.append({"date": today, "type": type, "category": category,
+                      "amount_paisa": rng.randint(100, 500_000), "description": "Bench"})
+    return batch
+
+
+def _loop(batch):
+    from features.budgets.engine import budget_alert
+    from features.transactions.engine import record_transaction
+    for t in batch:
+        if t["type"] == "expense":
+            budget_alert(t["category"], t["amount_paisa"])
+        record_transaction(t["type"], t["amount_paisa"], t["category"], t["description"], t["date"])
+
+
+def _batched(batch, fsync=False):
+    from features.transactions.engine import add_transactions
+    add_transactions(batch, fsync=fsync)
+
+
+def _run(name, fn, batch, base):
+    """Times `fn(batch)` in a fresh database holding `base`; returns (seconds, ledger bytes)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        with open(os.path.join(tmp, "database", "transactions.txt"), "w") as f:
+            f.writelines(base)
+        with open(os.path.join(tmp, "database", "budgets.txt"), "w") as f:
+            f.write("Food,5000000\nTransport,2000000\nBills,8000000\n")
+        os.chdir(tmp)
+        try:
+            from utils.rollups import update_rollups
+            update_rollups() # Warm sidecars, as in a running tracker
+            start = time.perf_counter()
+            fn(batch)
+            seconds = time.perf_counter() - start
+            with open(os.path.join("database", "transactions.txt"), "rb") as f:
+                return seconds, f.read()
+        finally:
+            os.chdir(PROJECT_ROOT)
+
+
+def bench(size, base):
+    batch = _batch(size)
+    print(f"\n{size} transactions onto {len(base)} rows")
+    print(f"{'path':<24} {'time':>10} {'rows/s':>12}")
+    results = {}
+    for name, fn in [
+        ("single-add loop", _loop),
+        ("add_transactions", _batched),
+        ("add_transactions fsync", lambda b: _batched(b, fsync=True)),
+    ]:
+        seconds, data = _run(name, fn, batch, base)
+        results[name] = data
+        print(f"{name:<24} {seconds * 1000:8.1f}ms {size / seconds:12,.0f}")
+    if len(set(results.values())) != 1:
+        print("MISMATCH: ledger files differ between paths")
+        sys.exit(1)
+
+
+def main():
+    base = sorted(synthetic_lines(BASE_ROWS))
+    for size in [int(arg) for arg in sys.argv[1:]] or [100, 1_000, 10_000]:
+        bench(size, base)
+
+
+if __name__ == "__main__":
+    main()
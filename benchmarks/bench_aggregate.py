@@ -0,0 +1,82 @@
+# benchmarks/bench_aggregate.py
+#
+# Checks that the pure-Python and NumPy aggregation backends agree, including on totals
+# past the int64 range, then times both.
+# Run from the project root: python -m benchmarks.bench_aggregate [rows]
+
+import sys
+import time
+from datetime import date
+from utils import aggregate
+from utils.ledger import MAX_AMOUNT_PAISA, Ledger, _parse_chunk
+from benchmarks.common import synthetic_lines
+
+
+def _ledger(lines):
+    ledger = Ledger()
+    _parse_chunk("".join(lines).encode(), ledger)
+    return ledger
+
+
+def _month_bounds(ledger):
+    """Every month spanned by the ledger, as (start, end) ordinals with its key."""
+    first, last = date.fromordinal(min(ledger.dates)), date.fromordinal(max(ledger.dates))
+    bounds = []
+    year, month = first.year, first.month
+    while (year, month) <= (last.year, last.month):
+        start = date(year, month, 1)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        bounds.append((start.toordinal(), date(year, month, 1).toordinal(), start.strftime("%Y-%m")))
+    return bounds
+
+
+def check_parity(ledger, top_n=5):
+    """Asserts both backends return identical results on `ledger`."""
+    n = len(ledger)
+    for start, stop in [(0, n), (0, 0), (n // 3, n // 2), (n - 1, n)]:
+        assert aggregate._python_group_totals(ledger, start, stop) == aggregate._numpy_group_totals(ledger, start, stop)
+        for max_date in [0, min(ledger.dates), max(ledger.dates)]:
+            assert aggregate._python_date_disorder(ledger, start, stop, max_date) == \
+                aggregate._numpy_date_disorder(ledger, start, stop, max_date)
+    bounds = _month_bounds(ledger)
+    for subset in [bounds, bounds[::3], bounds[-2:]]:
+        assert aggregate._python_top_expense_rows(ledger, subset, top_n) == aggregate._numpy_top_expense_rows(ledger, subset, top_n)
+
+
+def _time(label, fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms")
+    return elapsed
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    if not aggregate._load_numpy():
+        print("NumPy is not installed; only the pure-Python backend is available.")
+        return
+
+    # Small ledgers with many ties and edge dates first, then the timed one
+    for seed in range(5):
+        check_parity(_ledger(synthetic_lines(500, seed=seed, days=90)), top_n=3)
+    # Group totals past the int64 range, which NumPy sums would wrap
+    huge = [f"2025-01-0{day},expense,Food,{MAX_AMOUNT_PAISA - day},Huge\n" for day in range(1, 4)]
+    overflow = _ledger(huge + synthetic_lines(50, seed=7, days=30))
+    check_parity(overflow)
+    assert sum(total for *_, total in aggregate._numpy_group_totals(overflow, 0, 3)) == 3 * MAX_AMOUNT_PAISA - 6
+    ledger = _ledger(synthetic_lines(rows))
+    check_parity(ledger)
+    print(f"rows: {rows}, backends agree")
+
+    python = _time("python group_totals", aggregate._python_group_totals, ledger, 0, len(ledger))
+    numpy = _time("numpy group_totals", aggregate._numpy_group_totals, ledger, 0, len(ledger))
+    print(f"group_totals speedup: {python / numpy:.1f}x")
+    bounds = _month_bounds(ledger)
+    python = _time("python top_expense_rows", aggregate._python_top_expense_rows, ledger, bounds, 5)
+    numpy = _time("numpy top_expense_rows", aggregate._numpy_top_expense_rows, ledger, bounds, 5)
+    print(f"top_expense_rows speedup: {python / numpy:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
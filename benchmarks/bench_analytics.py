@@ -0,0 +1,64 @@
+# benchmarks/bench_analytics.py
+#
+# Times each analytics screen (and the smart assistant) against synthetic ledgers.
+# Run from the project root: python -m benchmarks.bench_analytics [rows ...]
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from benchmarks.common import synthetic_lines
+
+PROJECT_ROOT = os.getcwd()
+
+
+def _screens():
+    from features.analytics import analytics
+    from features.smart_assistant.smart_assistant import generate_recommendations
+    return [
+        ("spending_analysis", analytics.spending_analysis),
+        ("income_analysis", analytics.income_analysis),
+        ("savings_analysis", analytics.savings_analysis),
+        ("financial_health_score", analytics.financial_health_score),
+        ("generate_monthly_report", analytics.generate_monthly_report),
+        ("generate_recommendations", generate_recommendations),
+    ]
+
+
+def _time(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def bench(rows):
+    screens = _screens()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        with open(os.path.join(tmp, "database", "transactions.txt"), "w") as f:
+            f.writelines(sorted(synthetic_lines(rows)))
+        with open(os.path.join(tmp, "database", "budgets.txt"), "w") as f:
+            f.write("Food,5000000\nTransport,2000000\nBills,8000000\n")
+
+        os.chdir(tmp)
+        try:
+            print(f"\n{rows} rows")
+            print(f"{'screen':<26} {'first call':>12} {'next call':>12}")
+            for name, fn in screens:
+                first = _time(fn)
+                warm = _time(fn)
+                print(f"{name:<26} {first * 1000:10.1f}ms {warm * 1000:10.1f}ms")
+        finally:
+            os.chdir(PROJECT_ROOT)
+
+
+def main():
+    for rows in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        bench(rows)
+
+
+if __name__ == "__main__":
+    main()
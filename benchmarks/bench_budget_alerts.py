@@ -0,0 +1,211 @@
+# benchmarks/bench_budget_alerts.py
+#
+# Checks that budget alerts from the monthly rollups print exactly what the original
+# full scan of the ledger printed, then times both. Ledgers are shuffled out of date
+# order and grown with late-dated, back-dated and malformed lines, both through the
+# storage interface and by raw appends from another writer, then rewritten in place.
+# Exits with an AssertionError on the first mismatch.
+# Run from the project root: python -m benchmarks.bench_budget_alerts [rows]
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from rich.console import Console
+from benchmarks.common import synthetic_lines
+from utils.constants import EXPENSE_CATEGORIES
+
+PROJECT_ROOT = os.getcwd()
+TRANSACTIONS_FILE = "database/transactions.txt"
+BUDGETS_FILE = "database/budgets.txt"
+
+# Expense amounts (paisa) tried against every budget
+AMOUNTS = [1, 10_000, 2_500_000]
+
+
+def full_scan_alert(category, expense_amount_paisa):
+    """The original check_budget_alert, which re-read both files on every call."""
+    console = Console()
+
+    budgets = {}
+    try:
+        with open(BUDGETS_FILE, "r") as f:
+            for line in f:
+                parts = line.strip().split(',', 1)
+                if len(parts) == 2:
+                    cat, amount = parts
+                    budgets[cat] = int(amount)
+    except FileNotFoundError:
+        return # No budgets set, so no alerts
+
+    budgeted_amount_paisa = budgets.get(category)
+    if budgeted_amount_paisa is None:
+        return # No budget for this category
+
+    # Calculate current spending for the category this month
+    current_spending_paisa = 0
+    try:
+        with open(TRANSACTIONS_FILE, "r") as f:
+            for line in f:
+                parts = line.strip().split(',', 4)
+                if len(parts) == 5:
+                    date_str, type, trans_category, amount_paisa_str, _ = parts
+                    if type == 'expense' and trans_category == category and \
+                       datetime.strptime(date_str, "%Y-%m-%d").strftime("%Y-%m") == datetime.now().strftime("%Y-%m"):
+                        current_spending_paisa += int(amount_paisa_str)
+    except FileNotFoundError:
+        pass # No transactions yet
+
+    projected_spending_paisa = current_spending_paisa + expense_amount_paisa
+
+    if projected_spending_paisa > budgeted_amount_paisa:
+        overrun_amount_paisa = projected_spending_paisa - budgeted_amount_paisa
+        console.print(f"[bold red]🚨 Budget Alert! Your spending in '{category}' will exceed its monthly budget by {overrun_amount_paisa/100:.2f}![/bold red]")
+    elif projected_spending_paisa > budgeted_amount_paisa * 0.9: # Warn at 90%
+        remaining_paisa = budgeted_amount_paisa - projected_spending_paisa
+        console.print(f"[bold yellow]⚠️ Warning! You are close to exceeding your budget for '{category}'. {remaining_paisa/100:.2f} remaining.[/bold yellow]")
+
+
+def _output(fn, *args):
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        fn(*args)
+    return buffer.getvalue()
+
+
+def _month_spend(category):
+    """This month's spend in `category`, by full scan, to place budgets around it."""
+    month = date.today().strftime("%Y-%m")
+    spend = 0
+    with open(TRANSACTIONS_FILE) as f:
+        for line in f:
+            parts = line.strip().split(',', 4)
+            if len(parts) == 5 and parts[1] == "expense" and parts[2] == category and parts[0][:7] == month:
+                spend += int(parts[3])
+    return spend
+
+
+def _write_budgets(rng):
+    """Writes budgets that put the tried amounts under, near and over each category's limit."""
+    budgets = {}
+    for category in EXPENSE_CATEGORIES[:-1]: # Leave one category without a budget
+        spend = _month_spend(category)
+        amount = rng.choice(AMOUNTS)
+        budgets[category] = rng.choice([
+            max(spend // 2, 1),
+            spend + amount,                   # Exactly at the limit
+            int((spend + amount) / 0.9) + 1,  # Just under the 90% warning
+            int((spend + amount) / 0.9) - 1,  # Just over it
+            spend * 2 + 1,
+        ])
+    with open(BUDGETS_FILE, "w") as f:
+        f.writelines(f"{category},{amount}\n" for category, amount in budgets.items())
+
+
+def check_parity(rng, stage):
+    """Asserts check_budget_alert prints the same as the full scan for every category and amount."""
+    from features.budgets.budgets import check_budget_alert
+
+    _write_budgets(rng)
+    for category in EXPENSE_CATEGORIES + ["Unknown"]:
+        for amount in AMOUNTS:
+            expected = _output(full_scan_alert, category, amount)
+            actual = _output(check_budget_alert, category, amount)
+            assert actual == expected, f"{stage}: {category} {amount}: {actual!r} != {expected!r}"
+
+
+def _late_lines(rng, rows):
+    """Lines dated this month and last, in random order, so they land behind newer rows."""
+    today = date.today()
+    lines = []
+    for _ in range(rows):
+        day = today - timedelta(days=rng.randrange(45))
+        lines.append(f"{day.isoformat()},expense,{rng.choice(EXPENSE_CATEGORIES)},{rng.randint(100, 500_000)},Late\n")
+    return lines
+
+
+def check_scenarios(rows, seed):
+    """Builds a ledger of `rows` lines in a scratch directory and checks parity as it changes."""
+    from utils import ledger, rollups, storage
+
+    rng = random.Random(seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        os.chdir(tmp)
+        try:
+            ledger._budgets_cache.update(path=None)
+            rollups._rollups_cache.update(path=None)
+            storage._storages.clear()
+
+            # Out of date order from the start, with malformed lines mixed in
+            lines = synthetic_lines(rows, seed=seed, days=60)
+            rng.shuffle(lines)
+            lines[rows // 3:rows // 3] = ["not a transaction\n", "2025-01-01,expense,Food\n"]
+            with open(TRANSACTIONS_FILE, "w") as f:
+                f.writelines(lines)
+            check_parity(rng, "shuffled ledger")
+
+            # Late-dated rows added the way add_expense adds them
+            storage.get_storage().append(_late_lines(rng, 50))
+            check_parity(rng, "appended through storage")
+
+            # Another writer appends behind the rollups' back, ending without a newline
+            with open(TRANSACTIONS_FILE, "a") as f:
+                f.writelines(_late_lines(rng, 50))
+                f.write(f"{date.today().isoformat()},expense,Food,12345,Unfinished")
+            check_parity(rng, "raw appends")
+            with open(TRANSACTIONS_FILE, "a") as f:
+                f.write("\n")
+            check_parity(rng, "finished line")
+
+            # The file is rewritten in a different order (as a restore would)
+            with open(TRANSACTIONS_FILE) as f:
+                lines = f.readlines()
+            rng.shuffle(lines)
+            with open(TRANSACTIONS_FILE, "w") as f:
+                f.writelines(lines[: len(lines) - 10])
+            check_parity(rng, "rewritten ledger")
+        finally:
+            storage._storages.clear()
+            os.chdir(PROJECT_ROOT)
+
+
+def bench(rows):
+    """Times one alert by full scan and from the rollups on a `rows`-row ledger."""
+    from features.budgets.budgets import check_budget_alert
+    from utils import storage
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        os.chdir(tmp)
+        try:
+            storage._storages.clear()
+            with open(TRANSACTIONS_FILE, "w") as f:
+                f.writelines(sorted(synthetic_lines(rows)))
+            with open(BUDGETS_FILE, "w") as f:
+                f.write("Food,5000000\n")
+            _output(check_budget_alert, "Food", 100) # Builds the rollups once, as the first add would
+
+            for label, fn in [("full scan", full_scan_alert), ("rollups", check_budget_alert)]:
+                started = time.perf_counter()
+                _output(fn, "Food", 100)
+                print(f"{label:<10} {(time.perf_counter() - started) * 1000:9.2f} ms")
+        finally:
+            storage._storages.clear()
+            os.chdir(PROJECT_ROOT)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    for seed in range(5):
+        check_scenarios(2_000, seed)
+    print("budget alerts match the full scan")
+    bench(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# benchmarks/bench_dashboard.py
+#
+# Times the dashboard's DataFrame and page renders against a synthetic ledger, and
+# compares the typed schema and rollup-fed charts with the old row-level versions.
+# Needs streamlit and plotly; pages run in Streamlit's bare mode, so nothing is drawn
+# and the timings cover the data work behind each page.
+# Run from the project root: python -m benchmarks.bench_dashboard [rows]
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+import pandas as pd
+from benchmarks.common import synthetic_lines
+
+PROJECT_ROOT = os.getcwd()
+
+
+def _pages():
+    import dashboard
+    return dashboard, [
+        ("render_main_dashboard", dashboard.render_main_dashboard),
+        ("render_transactions_page", dashboard.render_transactions_page),
+        ("render_analytics_page", dashboard.render_analytics_page),
+        ("render_smart_assistant_page", dashboard.render_smart_assistant_page),
+    ]
+
+
+def _best(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stderr(io.StringIO()): # Bare-mode warnings
+            fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _legacy_frame(frame):
+    """The frame as the dashboard used to hold it: float rupees, object strings, no month key."""
+    return pd.DataFrame({
+        "Date": frame["Date"], "Type": frame["Type"].astype(object),
+        "Category": frame["Category"].astype(object), "Amount": frame["AmountPaisa"] / 100,
+        "Description": frame["Description"],
+    })
+
+
+def _report(label, legacy, typed):
+    print(f"{label:<30} {legacy * 1000:10.1f}ms {typed * 1000:10.1f}ms {legacy / typed:8.1f}x")
+
+
+def bench(rows):
+    dashboard, pages = _pages()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        with open(os.path.join(tmp, "database", "transactions.txt"), "w") as f:
+            f.writelines(sorted(synthetic_lines(rows)))
+        with open(os.path.join(tmp, "database", "budgets.txt"), "w") as f:
+            f.write("Food,5000000\nTransport,2000000\nBills,8000000\nShopping,3000000\n")
+
+        os.chdir(tmp)
+        try:
+            print(f"\n{rows} rows")
+            start = time.perf_counter()
+            frame = dashboard.get_transactions()
+            print(f"get_transactions first call   {(time.perf_counter() - start) * 1000:10.1f}ms")
+            print(f"get_transactions next call    {_best(dashboard.get_transactions) * 1000:10.3f}ms")
+
+            legacy = _legacy_frame(frame)
+            legacy_mb = legacy.drop(columns="Description").memory_usage(deep=True).sum() / 2**20
+            typed_mb = frame.drop(columns="Description").memory_usage(deep=True).sum() / 2**20
+            print(f"memory without Description    {legacy_mb:10.1f}MB {typed_mb:10.1f}MB  (old, new)")
+
+            now = datetime.now()
+            print(f"{'operation':<30} {'old':>12} {'new':>12} {'speedup':>9}")
+            _report(
+                "current-month filter",
+                _best(lambda: legacy[legacy["Date"].dt.strftime("%Y-%m") == now.strftime("%Y-%m")]),
+                _best(lambda: frame[frame["Month"] == dashboard.month_index(now)]),
+            )
+            _report(
+                "monthly trend (groupby/rollups)",
+                _best(lambda: legacy.assign(Month=legacy["Date"].dt.to_period("M").astype(str)).groupby(["Month", "Type"])["Amount"].sum()),
+                _best(dashboard.get_monthly_trend),
+            )
+
+            print(f"{'page':<30} {'render':>12}")
+            for name, fn in pages:
+                print(f"{name:<30} {_best(fn) * 1000:10.1f}ms")
+        finally:
+            os.chdir(PROJECT_ROOT)
+
+
+def main():
+    for rows in [int(arg) for arg in sys.argv[1:]] or [500_000]:
+        bench(rows)
+
+
+if __name__ == "__main__":
+    main()
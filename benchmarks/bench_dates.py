@@ -0,0 +1,39 @@
+# benchmarks/bench_dates.py
+#
+# Compares datetime.strptime with utils.dates.parse_date_ordinal on ledger dates.
+# Run from the project root: python -m benchmarks.bench_dates [rows]
+
+import sys
+import time
+from datetime import datetime
+from utils import dates
+from benchmarks.common import synthetic_lines
+
+
+def _time(label, fn, date_strs):
+    start = time.perf_counter()
+    for date_str in date_strs:
+        fn(date_str)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1e9 / len(date_strs):8.0f} ns/date")
+    return elapsed
+
+
+def _fast_uncached(date_str):
+    dates._ordinal_cache.clear()
+    return dates.parse_date_ordinal(date_str)
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    date_strs = [line[:10] for line in synthetic_lines(rows)]
+    print(f"rows: {rows}, distinct dates: {len(set(date_strs))}")
+    baseline = _time("strptime().toordinal()", lambda s: datetime.strptime(s, "%Y-%m-%d").toordinal(), date_strs)
+    _time("fast path, cache cleared", _fast_uncached, date_strs)
+    dates._ordinal_cache.clear()
+    fast = _time("fast path with memo", dates.parse_date_ordinal, date_strs)
+    print(f"speedup with memo: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# benchmarks/bench_ledger_memory.py
+#
+# Compares the memory held by the old list-of-dicts ledger with the columnar Ledger.
+# Run from the project root: python -m benchmarks.bench_ledger_memory [rows]
+
+import sys
+import tracemalloc
+from datetime import datetime
+from utils.ledger import _parse_chunk, Ledger
+from benchmarks.common import synthetic_lines
+
+
+def _load_as_dicts(lines):
+    """The per-row dict representation every loader used to build."""
+    transactions = []
+    for line in lines:
+        date_str, type, category, amount_paisa, description = line.strip().split(',', 4)
+        transactions.append({
+            "date": datetime.strptime(date_str, "%Y-%m-%d"),
+            "type": type,
+            "category": category,
+            "amount_paisa": int(amount_paisa),
+            "description": description
+        })
+    return transactions
+
+
+def _load_as_ledger(lines):
+    ledger = Ledger()
+    _parse_chunk("".join(lines).encode("utf-8"), ledger)
+    return ledger
+
+
+def _measure(loader, lines):
+    tracemalloc.start()
+    result = loader(lines)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lines = synthetic_lines(rows)
+    before = _measure(_load_as_dicts, lines)
+    after = _measure(_load_as_ledger, lines)
+    print(f"rows: {rows}")
+    print(f"list of dicts: {before / rows:.1f} bytes/row")
+    print(f"columnar:      {after / rows:.1f} bytes/row")
+    print(f"reduction:     {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
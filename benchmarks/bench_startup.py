@@ -0,0 +1,96 @@
+# benchmarks/bench_startup.py
+#
+# Checks cold-start import time against a budget with `python -X importtime`, for the
+# interactive menu (main.py with questionary and rich, i.e. up to the first prompt) and
+# for headless commands. Each path runs in fresh interpreters against an empty scratch
+# database; the median total import time must stay within its budget, and modules a
+# path should never load are reported. Budgets are multiples of the time a fixed set of
+# standard-library imports takes on the same machine, so a slower machine gets
+# proportionally larger budgets. Exits with status 1 if any check fails.
+# Run from the project root: python -m benchmarks.bench_startup [runs]
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.getcwd()
+
+# Standard-library imports timed as the unit of the budgets below
+REFERENCE_ARGS = ["-c", "import argparse, csv, decimal, json, logging"]
+
+# (label, interpreter arguments, budget in multiples of the reference time, module
+# prefixes that must not be imported). Each budget leaves about 50% headroom over the
+# ratio measured when it was set (menu 5.9x, add and balance 1.6x).
+STARTUP_PATHS = [
+    (
+        "menu", ["-c", "import main, questionary, rich.console"], 9.0,
+        ["features.", "numpy", "pandas", "dateutil"],
+    ),
+    (
+        "add", [os.path.join(PROJECT_ROOT, "main.py"), "add", "expense", "--amount", "1", "--category", "Food"], 2.5,
+        ["questionary", "prompt_toolkit", "rich", "numpy", "pandas", "concurrent.futures"],
+    ),
+    (
+        "balance", [os.path.join(PROJECT_ROOT, "main.py"), "balance"], 2.5,
+        ["questionary", "prompt_toolkit", "rich", "numpy", "pandas", "concurrent.futures"],
+    ),
+]
+
+
+def import_times(args, cwd):
+    """Runs a fresh interpreter with -X importtime; returns {module: cumulative us} for top-level imports."""
+    env = {**os.environ, "PYTHONPATH": PROJECT_ROOT}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=cwd, env=env, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.rstrip()] = int(cumulative)
+    return times
+
+
+def median_import_ms(args, runs, cwd):
+    """Returns the median total import time (ms) of `runs` fresh interpreters, and every module they loaded."""
+    totals, loaded = [], set()
+    for _ in range(runs):
+        times = import_times(args, cwd)
+        # Top-level imports have one leading space; nested ones are indented further
+        totals.append(sum(us for name, us in times.items() if not name.startswith("  ")) / 1000)
+        loaded.update(name.strip() for name in times)
+    return statistics.median(totals), loaded
+
+
+def check(label, args, budget_ms, forbidden, runs, cwd):
+    """Prints one startup path's import time; returns whether it is within budget and loads nothing forbidden."""
+    median, loaded = median_import_ms(args, runs, cwd)
+    unwanted = sorted(
+        name for name in loaded if any(name == prefix.rstrip(".") or name.startswith(prefix) for prefix in forbidden)
+    )
+    ok = median <= budget_ms and not unwanted
+    print(f"{label:<10} {median:8.1f}ms {budget_ms:8.1f}ms  {'ok' if ok else 'FAIL'}")
+    if unwanted:
+        print(f"{'':<10} imports {', '.join(unwanted[:8])}{' ...' if len(unwanted) > 8 else ''}")
+    return ok
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"{'path':<10} {'median':>10} {'budget':>10}  ({runs} runs each)")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        reference, _ = median_import_ms(REFERENCE_ARGS, runs, tmp)
+        print(f"{'reference':<10} {reference:8.1f}ms")
+        results = [
+            check(label, args, ratio * reference, forbidden, runs, tmp) for label, args, ratio, forbidden in STARTUP_PATHS
+        ]
+    if not all(results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
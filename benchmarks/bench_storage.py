@@ -0,0 +1,74 @@
+# benchmarks/bench_storage.py
+#
+# Times each analytics screen (and the smart assistant) on the text and SQLite storage
+# backends, against the same synthetic ledger migrated into both, plus the migration
+# itself and a newest-first page of the transaction list.
+# Run from the project root: python -m benchmarks.bench_storage [rows ...]
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_analytics import _screens
+from benchmarks.common import synthetic_lines
+
+PROJECT_ROOT = os.getcwd()
+
+
+def _time(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        fn()
+    return time.perf_counter() - start
+
+
+def _list_page():
+    import itertools
+    from features.transactions.engine import newest_transactions
+    total, transactions = newest_transactions("expenses")
+    list(itertools.islice(transactions, 50))
+
+
+def bench(rows):
+    from utils import storage
+    from utils.sqlite_storage import migrate_from_text
+
+    screens = _screens() + [("list_transactions page", _list_page)]
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        with open(os.path.join(tmp, "database", "transactions.txt"), "w") as f:
+            f.writelines(sorted(synthetic_lines(rows)))
+        with open(os.path.join(tmp, "database", "budgets.txt"), "w") as f:
+            f.write("Food,5000000\nTransport,2000000\nBills,8000000\n")
+
+        os.chdir(tmp)
+        try:
+            storage._storages.clear() # Backends hold paths and connections for this directory
+            started = time.perf_counter()
+            migrate_from_text()
+            print(f"\n{rows} rows (migrated to SQLite in {(time.perf_counter() - started) * 1000:.0f}ms)")
+            print(f"{'screen':<26} {'text first':>11} {'text next':>11} {'sqlite first':>13} {'sqlite next':>12}")
+            timings = {}
+            for backend in storage.STORAGE_BACKENDS:
+                os.environ[storage.STORAGE_ENV] = backend
+                for name, fn in screens:
+                    timings[name, backend] = (_time(fn), _time(fn))
+            for name, _ in screens:
+                (text_first, text_warm), (sqlite_first, sqlite_warm) = timings[name, "text"], timings[name, "sqlite"]
+                print(f"{name:<26} {text_first * 1000:9.1f}ms {text_warm * 1000:9.1f}ms "
+                      f"{sqlite_first * 1000:11.1f}ms {sqlite_warm * 1000:10.1f}ms")
+        finally:
+            os.environ.pop(storage.STORAGE_ENV, None)
+            storage._storages.clear()
+            os.chdir(PROJECT_ROOT)
+
+
+def main():
+    for rows in [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]:
+        bench(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+# benchmarks/bench_suite.py
+#
+# End-to-end benchmark suite. For each ledger size it writes a synthetic database, then
+# times the loaders, every menu screen that reads the ledger (with scripted answers to
+# their prompts), export, backup and import. Results are printed (or saved) as JSON with
+# the commit they were measured on, so two runs can be compared for regressions:
+#   python -m benchmarks.bench_suite --output before.json
+#   python -m benchmarks.bench_suite --compare before.json
+# Run from the project root: python -m benchmarks.bench_suite [--rows N ...] [--repeat N]
+#     [--storage text|sqlite] [--output FILE] [--compare FILE] [--threshold RATIO]
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from benchmarks.common import synthetic_lines, write_database
+
+PROJECT_ROOT = os.getcwd()
+SIZES = [10_000, 100_000, 1_000_000]
+SUITE_VERSION = 1
+
+
+# --- Harness ---
+
+@contextlib.contextmanager
+def _answers(*answers):
+    """Answers the questionary prompts of the block with `answers`, in order."""
+    import questionary
+
+    queue = list(answers)
+
+    class _Prompt:
+        def ask(self):
+            return queue.pop(0)
+
+    saved = {name: getattr(questionary, name) for name in ("select", "text", "confirm")}
+    for name in saved:
+        setattr(questionary, name, lambda *args, **kwargs: _Prompt())
+    try:
+        yield
+    finally:
+        for name, prompt in saved.items():
+            setattr(questionary, name, prompt)
+
+
+def _reset_caches():
+    """Drops every in-process cache of the ledger, budgets, rollups and fingerprints (sidecar files stay)."""
+    from utils import fingerprints, ledger, rollups, storage
+    ledger._ledger_cache.update(path=None)
+    ledger._budgets_cache.update(path=None)
+    rollups._rollups_cache.update(path=None)
+    fingerprints._fingerprints_cache.update(path=None)
+    storage._storages.clear()
+
+
+def _measure(fn, setup, repeat):
+    """Times `fn` once right after the caches are reset, then `repeat` more times.
+
+    `setup` runs untimed before every call. Returns (first, warm, output): the first
+    time, the later times and what the last call printed.
+    """
+    times, output = [], ""
+    for run in range(repeat + 1):
+        if setup is not None:
+            setup()
+        if run == 0:
+            _reset_caches()
+        buffer = io.StringIO()
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(buffer):
+            fn()
+        times.append(time.perf_counter() - started)
+        output = buffer.getvalue()
+    return times[0], times[1:], output
+
+
+# --- Operations ---
+
+def _operations(storage_name, paths):
+    """Returns the timed operations as (name, function, setup) for one database."""
+    from features.analytics import analytics
+    from features.budgets.budgets import check_budget_alert
+    from features.data_management import data_management
+    from features.smart_assistant.smart_assistant import generate_recommendations
+    from features.transactions.transactions import show_balance
+    from utils.fingerprints import FINGERPRINTS_FILE, load_fingerprints
+    from utils.ledger import load_budgets, load_ledger, load_transactions
+    from utils.rollups import rebuild_rollups
+
+    def remove_fingerprints():
+        _reset_caches()
+        if os.path.exists(FINGERPRINTS_FILE):
+            os.remove(FINGERPRINTS_FILE)
+
+    def restore_database():
+        shutil.rmtree("database")
+        shutil.copytree(paths["snapshot"], "database")
+
+    def export_data():
+        with _answers("CSV", "All time", paths["export"]):
+            data_management.export_data()
+
+    def import_data():
+        with _answers(paths["import"]):
+            data_management.import_data()
+
+    operations = []
+    if storage_name == "text":
+        # Loaders parse from scratch on every call
+        operations += [
+            ("load_ledger", load_ledger, _reset_caches),
+            ("load_transactions", load_transactions, _reset_caches),
+            ("load_budgets", load_budgets, _reset_caches),
+            ("rebuild_rollups", rebuild_rollups, None),
+            ("load_fingerprints", load_fingerprints, remove_fingerprints),
+        ]
+    operations += [
+        ("show_balance", show_balance, None),
+        ("spending_analysis", analytics.spending_analysis, None),
+        ("income_analysis", analytics.income_analysis, None),
+        ("savings_analysis", analytics.savings_analysis, None),
+        ("financial_health_score", analytics.financial_health_score, None),
+        ("generate_monthly_report", analytics.generate_monthly_report, None),
+        ("generate_recommendations", generate_recommendations, None),
+        ("check_budget_alert", lambda: check_budget_alert("Food", 100_000), None),
+        ("export_data", export_data, None),
+        ("backup_data", data_management.backup_data, lambda: shutil.rmtree("backups", ignore_errors=True)),
+        # Imports change the ledger, so each starts again from the same database
+        ("import_data", import_data, restore_database),
+    ]
+    return operations
+
+
+def _write_import_file(path, lines, rows):
+    """Writes a CSV import of `rows` records: half copies of ledger lines, half new ones."""
+    duplicates = lines[: rows // 2]
+    fresh = synthetic_lines(rows - len(duplicates), seed=7)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["date", "type", "category", "amount_paisa", "description"])
+        for line in duplicates + fresh:
+            writer.writerow(line.rstrip("\n").split(",", 4))
+
+
+def bench(rows, repeat, storage_name):
+    """Runs every operation against a fresh `rows`-row database; returns their results."""
+    from utils import storage
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        lines = synthetic_lines(rows)
+        write_database(tmp, lines)
+        paths = {
+            "snapshot": os.path.join(tmp, "snapshot"),
+            "export": os.path.join(tmp, "export.csv"),
+            "import": os.path.join(tmp, "import.csv"),
+        }
+        _write_import_file(paths["import"], lines, max(rows // 10, 1))
+
+        os.chdir(tmp)
+        try:
+            os.environ[storage.STORAGE_ENV] = storage_name
+            _reset_caches()
+            if storage_name == "sqlite":
+                from utils.sqlite_storage import migrate_from_text
+                migrate_from_text()
+            # Sidecars are built once up front, as in a tracker that has been used before
+            storage.get_storage().fingerprints()
+            storage.get_storage().is_empty()
+            shutil.copytree("database", paths["snapshot"])
+
+            for name, fn, setup in _operations(storage_name, paths):
+                first, warm, output = _measure(fn, setup, repeat)
+                result = {
+                    "name": name, "rows": rows,
+                    "first_ms": round(first * 1000, 3),
+                    "warm_ms": round(statistics.median(warm) * 1000, 3) if warm else None,
+                    "error": "error" in output.lower(),
+                }
+                results.append(result)
+                print(f"{rows:>9} {name:<26} {result['first_ms']:10.1f}ms {result['warm_ms'] or 0:10.1f}ms"
+                      f"{'  ERROR' if result['error'] else ''}", file=sys.stderr)
+        finally:
+            os.environ.pop(storage.STORAGE_ENV, None)
+            _reset_caches()
+            os.chdir(PROJECT_ROOT)
+    return results
+
+
+# --- Reporting ---
+
+def _git_revision():
+    """Returns `git describe --always --dirty` for the project, or None outside a checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(baseline, current, threshold):
+    """Prints each operation's time against a baseline run; returns the regressions.
+
+    Warm times are compared where both runs have them, first-call times otherwise.
+    An operation regresses if it became more than `threshold` times slower.
+    """
+    def times(report):
+        return {(r["rows"], r["name"]): r["warm_ms"] if r["warm_ms"] is not None else r["first_ms"]
+                for r in report["results"]}
+
+    before, after = times(baseline), times(current)
+    print(f"\nvs {baseline['meta'].get('revision')}: {'rows':>9} {'operation':<26} {'before':>10} {'after':>10} {'ratio':>7}",
+          file=sys.stderr)
+    regressions = []
+    for key, after_ms in after.items():
+        if key not in before:
+            continue
+        before_ms = before[key]
+        ratio = after_ms / before_ms if before_ms > 0 else float("inf")
+        slower = ratio > threshold
+        if slower:
+            regressions.append({"rows": key[0], "name": key[1], "before_ms": before_ms, "after_ms": after_ms})
+        print(f"{'':>{len(str(baseline['meta'].get('revision'))) + 4}}{key[0]:>9} {key[1]:<26} {before_ms:9.1f}ms "
+              f"{after_ms:9.1f}ms {ratio:6.2f}x{'  SLOWER' if slower else ''}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite", description="End-to-end benchmark suite.")
+    parser.add_argument("--rows", type=int, nargs="+", default=SIZES, help="ledger sizes (default: 10k 100k 1M)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed calls after the first (default: 3)")
+    parser.add_argument("--storage", choices=["text", "sqlite"], default="text")
+    parser.add_argument("--output", help="file for the JSON results (default: stdout)")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio counted as a regression")
+    args = parser.parse_args(argv)
+
+    from utils import aggregate
+
+    report = {
+        "meta": {
+            "suite_version": SUITE_VERSION,
+            "revision": _git_revision(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "numpy": aggregate.HAS_NUMPY,
+            "storage": args.storage,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    print(f"{'rows':>9} {'operation':<26} {'first':>12} {'warm':>12}", file=sys.stderr)
+    for rows in args.rows:
+        report["results"] += bench(rows, args.repeat, args.storage)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        report["regressions"] = regressions
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 1 if regressions or any(r["error"] for r in report["results"]) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+# benchmarks/bench_writers.py
+#
+# Runs several writer processes at once against one database: each appends batches of
+# transactions (as cron imports and headless `add`s would) and sets a budget of its own.
+# Afterwards every ledger line must be intact, no row may be lost and every writer's
+# budget must survive. Prints the throughput and how often a writer waited for a lock.
+# Run from the project root: python -m benchmarks.bench_writers [writers] [batches] [rows]
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+PROJECT_ROOT = os.getcwd()
+
+
+def _writer(args):
+    """One writer process: appends `batches` batches of `rows` rows, then sets its budget."""
+    directory, writer, batches, rows = args
+    os.chdir(directory)
+    from features.transactions.engine import add_transactions
+    from utils.ledger import update_budget
+    from utils.locking import lock_stats
+
+    for batch in range(batches):
+        add_transactions(
+            {"type": "expense", "category": "Food", "amount_paisa": 100 + i, "description": f"w{writer} b{batch} r{i}"}
+            for i in range(rows)
+        )
+    update_budget(f"Writer{writer}", 1000 + writer)
+    return lock_stats()
+
+
+def main():
+    writers, batches, rows = ([int(arg) for arg in sys.argv[1:4]] + [8, 50, 200][len(sys.argv[1:4]):])
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "database"))
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=writers) as pool:
+            stats = list(pool.map(_writer, [(tmp, w, batches, rows) for w in range(writers)]))
+        seconds = time.perf_counter() - started
+
+        with open(os.path.join(tmp, "database", "transactions.txt")) as f:
+            lines = f.read().split("\n")
+        with open(os.path.join(tmp, "database", "budgets.txt")) as f:
+            budgets = dict(line.split(",") for line in f.read().split())
+
+    expected = writers * batches * rows
+    torn = [line for line in lines[:-1] if len(line.split(",", 4)) != 5 or not line.split(",")[4].startswith("w")]
+    lost_budgets = [w for w in range(writers) if budgets.get(f"Writer{w}") != str(1000 + w)]
+    print(f"{writers} writers x {batches} batches x {rows} rows in {seconds * 1000:.0f}ms "
+          f"({expected / seconds:,.0f} rows/s)")
+    print(f"locks taken {sum(s['acquired'] for s in stats)}, contended {sum(s['contended'] for s in stats)}, "
+          f"waited {sum(s['wait_seconds'] for s in stats) * 1000:.1f}ms in total")
+    ok = len(lines) - 1 == expected and lines[-1] == "" and not torn and not lost_budgets
+    print(f"rows {len(lines) - 1}/{expected}, torn lines {len(torn)}, lost budgets {len(lost_budgets)}  "
+          f"{'ok' if ok else 'FAIL'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# benchmarks/common.py
+
+import os
+import random
+from datetime import date, timedelta
+from utils.constants import EXPENSE_CATEGORIES, INCOME_CATEGORIES
+
+DESCRIPTIONS = ["Groceries", "Fuel", "Rent", "Lunch", "Movie", "Pharmacy", "Salary", "Transfer", "Gift", "Misc"]
+
+# Budgets written alongside synthetic ledgers, in paisa
+BUDGETS = {"Food": 5_000_000, "Transport": 2_000_000, "Bills": 8_000_000}
+
+
+def synthetic_lines(rows, seed=42, days=730, expense_share=0.8, end=None):
+    """Returns `rows` ledger lines spread over the `days` before `end` (today by default).
+
+    Each row is an expense with probability `expense_share`, in a category drawn
+    uniformly from utils/constants, and an income otherwise. The same arguments
+    always give the same lines.
+    """
+    rng = random.Random(seed)
+    start = (end or date.today()) - timedelta(days=days)
+    lines = []
+    for _ in range(rows):
+        day = start + timedelta(days=rng.randrange(days))
+        if rng.random() < expense_share:
+            type, category = "expense", rng.choice(EXPENSE_CATEGORIES)
+        else:
+            type, category = "income", rng.choice(INCOME_CATEGORIES)
+        lines.append(f"{day.isoformat()},{type},{category},{rng.randint(100, 5_000_000)},{rng.choice(DESCRIPTIONS)}\n")
+    return lines
+
+
+def write_database(directory, lines, budgets=BUDGETS):
+    """Writes ledger lines (in date order) and budgets into `directory`/database."""
+    os.makedirs(os.path.join(directory, "database"), exist_ok=True)
+    with open(os.path.join(directory, "database", "transactions.txt"), "w") as f:
+        f.writelines(sorted(lines))
+    with open(os.path.join(directory, "database", "budgets.txt"), "w") as f:
+        f.writelines(f"{category},{amount}\n" for category, amount in budgets.items())
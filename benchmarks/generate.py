@@ -0,0 +1,36 @@
+# benchmarks/generate.py
+#
+# Writes a deterministic synthetic ledger (and the benchmark budgets) for trying the app
+# or a benchmark on realistic sizes. Refuses to overwrite existing data unless --force.
+# Run from the project root: python -m benchmarks.generate ROWS [--days N] [--seed N]
+#     [--expense-share F] [--end YYYY-MM-DD] [--dir DIR] [--force]
+
+import argparse
+import os
+import sys
+from datetime import date
+from benchmarks.common import synthetic_lines, write_database
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.generate", description="Write a synthetic ledger.")
+    parser.add_argument("rows", type=int)
+    parser.add_argument("--days", type=int, default=730, help="date span in days, ending at --end (default: 730)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--expense-share", type=float, default=0.8, help="fraction of rows that are expenses (default: 0.8)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last possible date, YYYY-MM-DD (default: today)")
+    parser.add_argument("--dir", default=".", help="directory to write database/ into (default: current)")
+    parser.add_argument("--force", action="store_true", help="overwrite an existing database/transactions.txt")
+    args = parser.parse_args(argv)
+
+    path = os.path.join(args.dir, "database", "transactions.txt")
+    if os.path.exists(path) and not args.force:
+        print(f"{path} already exists; use --force to overwrite it.", file=sys.stderr)
+        return 1
+    write_database(args.dir, synthetic_lines(args.rows, args.seed, args.days, args.expense_share, args.end))
+    print(f"Wrote {args.rows} rows to {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
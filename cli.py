@@ -0,0 +1,244 @@
+# cli.py
+#
+# Non-interactive subcommands over the feature modules, for scripts and cron jobs:
+#   python main.py add expense --amount 250 --category Food --description "Lunch"
+#   python main.py list --filter expenses --limit 20 --format csv
+#   python main.py report --month 2025-01
+#   FINANCE_STORAGE=sqlite python main.py balance     (after `python main.py migrate`)
+# Results go to stdout as JSON (the default) or CSV, with amounts in paisa.
+# Errors go to stderr with exit status 1; bad arguments exit with status 2.
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from features.budgets.engine import budget_alert
+from features.transactions.engine import LIST_FILTERS, month_balance, newest_transactions, record_transaction
+from utils.dates import parse_date_ordinal
+from utils.ledger import BUDGETS_FILE, TRANSACTIONS_FILE
+from utils.storage import SQLITE_FILE, get_storage
+from utils.transfer import EXPORT_FIELDS, export_records
+
+# --- Argument types ---
+
+def _amount_paisa(text):
+    """Parses a rupee amount with at most two decimal places into paisa."""
+    try:
+        paisa = Decimal(text) * 100
+    except InvalidOperation:
+        paisa = None
+    if paisa is None or not paisa.is_finite() or paisa != paisa.to_integral_value() or paisa <= 0:
+        raise argparse.ArgumentTypeError(f"invalid amount '{text}': use a positive number with at most two decimal places")
+    return int(paisa)
+
+def _date(text):
+    """Checks a YYYY-MM-DD date, returning it unchanged."""
+    try:
+        parse_date_ordinal(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{text}': use YYYY-MM-DD") from None
+    return text
+
+def _month(text):
+    """Checks a YYYY-MM month key, returning it zero-padded."""
+    try:
+        month = datetime.strptime(text, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid month '{text}': use YYYY-MM") from None
+    return f"{month.year:04d}-{month.month:02d}"
+
+def _count(text):
+    """Parses a non-negative integer."""
+    try:
+        value = int(text)
+    except ValueError:
+        value = -1
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"invalid count '{text}': use a whole number, 0 or more")
+    return value
+
+# --- Output ---
+
+def _transaction_record(t):
+    """Returns a transaction dict with its date as YYYY-MM-DD, ready for JSON or CSV."""
+    return {**t, "date": t["date"].strftime("%Y-%m-%d")}
+
+def _write_result(data, fields, rows, output_format, out):
+    """Writes a command's result: `data` as JSON, or `rows` (flat dicts) as CSV with `fields`."""
+    if output_format == "json":
+        json.dump(data, out)
+        out.write("\n")
+    else:
+        writer = csv.DictWriter(out, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+
+# --- Commands ---
+# Each returns (data, fields, rows) for _write_result, or None once it has written its own output.
+# The analytics and data management engines (dateutil, the process pool) are imported by
+# the handlers that use them, so the everyday commands start without them.
+
+def cmd_add(args, out):
+    """Adds one expense or income transaction."""
+    # Like the interactive screen, the alert compares against spending before this expense
+    alert = budget_alert(args.category, args.amount) if args.type == "expense" else None
+    record = record_transaction(args.type, args.amount, args.category, args.description, args.date)
+    data = {**record, "budget_alert": alert}
+    row = {**record, "budget_status": alert and alert["status"], "budget_amount_paisa": alert and alert["amount_paisa"]}
+    return data, EXPORT_FIELDS + ["budget_status", "budget_amount_paisa"], [row]
+
+def cmd_list(args, out):
+    """Lists transactions newest first, one page at a time."""
+    total, transactions = newest_transactions(args.filter)
+    stop = None if args.limit == 0 else args.offset + args.limit
+    page = [_transaction_record(t) for t in itertools.islice(transactions, args.offset, stop)]
+    return {"total": total, "offset": args.offset, "transactions": page}, EXPORT_FIELDS, page
+
+def cmd_balance(args, out):
+    """Shows a month's income, expense and balance."""
+    balance = month_balance(args.month)
+    return balance, list(balance), [balance]
+
+def cmd_report(args, out):
+    """Builds the monthly report; as CSV, its category breakdown."""
+    from features.analytics.engine import monthly_report
+
+    report = monthly_report(args.month or datetime.now().strftime("%Y-%m"), top_n=args.top)
+    return report, ["category", "spent", "budget", "variance"], report["categories"]
+
+def cmd_export(args, out):
+    """Exports transactions in the output format, to stdout or a file."""
+    from features.data_management.engine import write_export
+
+    start = parse_date_ordinal(args.start) if args.start else None
+    end = parse_date_ordinal(args.end) + 1 if args.end else None # --to is inclusive
+    records = export_records(get_storage().scan(start, end))
+    export_format = args.format.upper()
+    if args.output in (None, "-"):
+        write_export(records, out, export_format)
+        return None
+    with open(args.output, "w", newline='' if export_format == "CSV" else None) as f:
+        count = write_export(records, f, export_format)
+    data = {"exported": count, "output": args.output}
+    return data, list(data), [data]
+
+def cmd_import(args, out):
+    """Imports CSV/JSON files, directories or globs, skipping duplicates and invalid rows."""
+    from features.data_management.engine import batch_import, batch_import_paths
+
+    file_paths = list(dict.fromkeys(path for pattern in args.paths for path in batch_import_paths(pattern)))
+    if not file_paths:
+        raise ValueError("No CSV or JSON files found.")
+    results, added, workers, seconds = batch_import(file_paths)
+    files = [
+        {
+            "path": result["path"], "rows": result["rows"], "added": result["added"],
+            "duplicates": 0 if result["error"] else result["rows"] - result["invalid"] - result["added"],
+            "invalid": result["invalid"], "error": result["error"],
+        }
+        for result in results
+    ]
+    total_rows = sum(result["rows"] for result in results)
+    data = {"added": added, "skipped": total_rows - added, "workers": workers, "seconds": round(seconds, 3), "files": files}
+    return data, ["path", "rows", "added", "duplicates", "invalid", "error"], files
+
+def cmd_backup(args, out):
+    """Zips the database directory into the backups directory."""
+    from features.data_management.engine import create_backup
+
+    if not any(os.path.exists(path) for path in (TRANSACTIONS_FILE, BUDGETS_FILE, SQLITE_FILE)):
+        raise ValueError("No data files found to back up.")
+    data = {"path": create_backup()}
+    return data, list(data), [data]
+
+def cmd_migrate(args, out):
+    """Copies the transactions and budgets text files into the SQLite database."""
+    from utils.sqlite_storage import migrate_from_text
+
+    if not os.path.exists(TRANSACTIONS_FILE) and not os.path.exists(BUDGETS_FILE):
+        raise ValueError("No text data files found to migrate.")
+    data = migrate_from_text(replace=args.replace)
+    return data, list(data), [data]
+
+def cmd_diagnostics(args, out):
+    """Reports the storage, its file sizes and the counters of loading it, with advice."""
+    from features.diagnostics.engine import diagnostics_report
+
+    data = diagnostics_report()
+    rows = [{"name": name, "value": value} for name, value in data["counters"].items()]
+    return data, ["name", "value"], rows
+
+# --- Parser ---
+
+def build_parser():
+    """Returns the argument parser for every subcommand."""
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=["json", "csv"], default="json", help="output format (default: json)")
+
+    parser = argparse.ArgumentParser(
+        prog="main.py", description="Personal Finance Tracker. Run without arguments for the interactive menu."
+    )
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+
+    add = commands.add_parser("add", parents=[common], help="add an expense or income")
+    add.add_argument("type", choices=["expense", "income"])
+    add.add_argument("--amount", type=_amount_paisa, required=True, help="amount in rupees, e.g. 120.50")
+    add.add_argument("--category", required=True, help="expense category or income source")
+    add.add_argument("--description", default="")
+    add.add_argument("--date", type=_date, help="YYYY-MM-DD (default: today)")
+    add.set_defaults(handler=cmd_add)
+
+    list_ = commands.add_parser("list", parents=[common], help="list transactions, newest first")
+    list_.add_argument("--filter", choices=list(LIST_FILTERS.values()), default="all")
+    list_.add_argument("--limit", type=_count, default=50, help="rows to return; 0 for all (default: 50)")
+    list_.add_argument("--offset", type=_count, default=0, help="rows to skip first (default: 0)")
+    list_.set_defaults(handler=cmd_list)
+
+    balance = commands.add_parser("balance", parents=[common], help="show a month's balance")
+    balance.add_argument("--month", type=_month, help="YYYY-MM (default: this month)")
+    balance.set_defaults(handler=cmd_balance)
+
+    report = commands.add_parser("report", parents=[common], help="build a monthly report")
+    report.add_argument("--month", type=_month, help="YYYY-MM (default: this month)")
+    report.add_argument("--top", type=_count, default=5, help="largest expenses to include (default: 5)")
+    report.set_defaults(handler=cmd_report)
+
+    export = commands.add_parser("export", parents=[common], help="export transactions")
+    export.add_argument("--from", dest="start", type=_date, help="first date, YYYY-MM-DD")
+    export.add_argument("--to", dest="end", type=_date, help="last date, YYYY-MM-DD")
+    export.add_argument("--output", help="file to write (default: stdout)")
+    export.set_defaults(handler=cmd_export)
+
+    import_ = commands.add_parser("import", parents=[common], help="import CSV/JSON files, directories or globs")
+    import_.add_argument("paths", nargs="+")
+    import_.set_defaults(handler=cmd_import)
+
+    backup = commands.add_parser("backup", parents=[common], help="back up the database directory")
+    backup.set_defaults(handler=cmd_backup)
+
+    migrate = commands.add_parser(
+        "migrate", parents=[common], help="copy the text files into the SQLite database (use with FINANCE_STORAGE=sqlite)"
+    )
+    migrate.add_argument("--replace", action="store_true", help="overwrite a database that already holds transactions")
+    migrate.set_defaults(handler=cmd_migrate)
+
+    diagnostics = commands.add_parser("diagnostics", parents=[common], help="report storage size and data-path counters")
+    diagnostics.set_defaults(handler=cmd_diagnostics)
+    return parser
+
+def run(argv, out=None):
+    """Runs one subcommand; returns the process exit status."""
+    out = out or sys.stdout
+    args = build_parser().parse_args(argv)
+    try:
+        result = args.handler(args, out)
+    except (ValueError, OSError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    if result is not None:
+        _write_result(*result, args.format, out)
+    return 0
@@ -5,10 +5,31 @@ from dateutil.relativedelta import relativedelta
 import os
 import plotly.express as px
 import shutil
-import csv
-import json
-from io import StringIO, BytesIO
+import itertools
+import tempfile
+import threading
+import numpy as np
+from io import BytesIO, TextIOWrapper
+from features.data_management.engine import validate_record
+from features.transactions.engine import record_transaction
 from utils.constants import EXPENSE_CATEGORIES, INCOME_CATEGORIES
+from utils.ledger import TRANSACTIONS_FILE, Ledger, _refresh_ledger, iter_rows, load_budgets
+from utils.rollups import load_rollups, month_totals, recent_rows
+from utils.fingerprints import fingerprint
+from utils.storage import STORAGE_ENV, get_storage
+from utils.transfer import EXPORT_FIELDS, export_records, iter_json_array, write_csv, write_json
+
+# Day ordinal of 1970-01-01, the epoch of datetime64
+UNIX_EPOCH_ORDINAL = 719163
+# Stored columns: 'Month' is year * 12 + month - 1, 'AmountPaisa' is int64 and
+# 'Type'/'Category' are categoricals over the ledger's names
+TRANSACTION_COLUMNS = ["Date", "Month", "Type", "Category", "AmountPaisa", "Description"]
+# Columns shown in tables, with the amount in rupees
+DISPLAY_COLUMNS = ["Date", "Type", "Category", "Amount", "Description"]
+# Uploads are read this many records at a time. Every column is read as text, so a
+# bad amount or date invalidates its row rather than the whole file.
+IMPORT_CHUNK_ROWS = 50_000
+IMPORT_DTYPES = {field: str for field in EXPORT_FIELDS}
 
 # --- App Styling ---
 def apply_styling():
@@ -23,48 +44,234 @@ def apply_styling():
     """
     st.markdown(custom_css, unsafe_allow_html=True)
 
-# --- Session State Initializer ---
-def initialize_session_state():
-    if 'transactions' not in st.session_state:
-        st.session_state.transactions = pd.DataFrame(columns=["Date", "Type", "Category", "Amount", "Description"])
-    if 'budgets' not in st.session_state:
-        st.session_state.budgets = {}
+# --- Data Source ---
+# The dashboard reads the same files as the CLI. The parsed ledger comes from
+# utils.ledger; the DataFrame built from it is shared by every session and only
+# grows by the rows appended since it was last checked.
 
-# --- Session-Aware Helper Functions ---
-def get_transactions():
-    return st.session_state.transactions
+def month_index(d):
+    """Returns the 'Month' column value of a date: year * 12 + month - 1."""
+    return d.year * 12 + d.month - 1
+
+def _frame_from_ledger(ledger, start, stop):
+    """Builds the transactions DataFrame for ledger rows `start` to `stop`.
+
+    Columns are read from slices (copies) of the ledger's arrays, so no view pins the
+    arrays' buffers while the ledger grows.
+    """
+    days = np.frombuffer(ledger.dates[start:stop], dtype=np.int32)
+    types = np.frombuffer(ledger.types[start:stop], dtype=np.uint8)
+    categories = np.frombuffer(ledger.categories[start:stop], dtype=np.uint16)
+    amounts = np.frombuffer(ledger.amounts[start:stop], dtype=np.int64)
+    dates = (days - UNIX_EPOCH_ORDINAL).astype("datetime64[D]")
+    pool = ledger.description_pool
+    return pd.DataFrame({
+        "Date": dates.astype("datetime64[ns]"),
+        "Month": dates.astype("datetime64[M]").astype(np.int32) + 1970 * 12,
+        "Type": pd.Categorical.from_codes(types.astype(np.int16), categories=ledger.type_names),
+        "Category": pd.Categorical.from_codes(categories.astype(np.int32), categories=ledger.category_names),
+        "AmountPaisa": amounts,
+        "Description": [pool[code] for code in ledger.descriptions[start:stop]],
+    }, columns=TRANSACTION_COLUMNS)
+
+def _empty_frame():
+    return _frame_from_ledger(Ledger(), 0, 0)
+
+def _append_rows(base, tail):
+    """Concatenates two transaction frames, keeping 'Type' and 'Category' categorical.
+
+    The ledger's name lists only ever grow, so `base`'s categories are a prefix of `tail`'s.
+    """
+    for column in ("Type", "Category"):
+        categories = tail[column].cat.categories
+        if len(base[column].cat.categories) != len(categories):
+            base = base.assign(**{column: base[column].cat.set_categories(categories)})
+    return pd.concat([base, tail], ignore_index=True)
+
+def _for_display(df):
+    """Returns transaction rows for tables, with 'AmountPaisa' shown as 'Amount' in rupees."""
+    return df.assign(Amount=df['AmountPaisa'] / 100)[DISPLAY_COLUMNS]
+
+@st.cache_resource
+def _data_lock():
+    """Held while reading or updating the process-wide ledger, rollups and budgets caches.
+
+    Sessions run in separate threads, and those caches are grown in place.
+    """
+    return threading.RLock()
+
+@st.cache_resource
+def _transactions_cache():
+    """Process-wide state behind get_transactions(), kept across reruns and sessions."""
+    return {
+        "size": -1, "mtime_ns": -1,
+        "ledger": None, "rows": 0, # Ledger object and complete rows already in "base"
+        "base": _empty_frame(), "frame": _empty_frame(),
+    }
+
+def get_transactions(path=TRANSACTIONS_FILE):
+    """Returns the transactions file as a DataFrame, converting only newly appended rows.
+
+    The frame is shared between reruns and sessions and must be treated as read-only.
+    """
+    cache = _transactions_cache()
+    with _data_lock():
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return _empty_frame()
+        if cache["size"] == stat.st_size and cache["mtime_ns"] == stat.st_mtime_ns:
+            return cache["frame"]
+
+        state = _refresh_ledger(path)
+        ledger, complete_rows = state["ledger"], state["complete_rows"]
+        if cache["ledger"] is ledger and cache["rows"] <= complete_rows:
+            base, rows = cache["base"], cache["rows"]
+        else: # The file was rewritten, so the ledger was re-parsed from the start
+            base, rows = _empty_frame(), 0
+        if complete_rows > rows:
+            base = _append_rows(base, _frame_from_ledger(ledger, rows, complete_rows))
+
+        # An unfinished last line is shown but not kept in "base"; it is re-parsed once finished
+        frame = base
+        if len(ledger) > complete_rows:
+            frame = _append_rows(base, _frame_from_ledger(ledger, complete_rows, len(ledger)))
+
+        cache.update(
+            size=stat.st_size, mtime_ns=stat.st_mtime_ns,
+            ledger=ledger, rows=complete_rows, base=base, frame=frame,
+        )
+        return frame
+
+def _rollups_version(rollups):
+    """Identifies the ledger bytes a rollups dict was built from, as a cache key."""
+    return rollups["offset"], rollups["rows"], rollups["last_line"]
+
+@st.cache_data(max_entries=8)
+def _trend_frame(version, _months):
+    """Monthly income, expense and savings in rupees, oldest first, cached per rollups `version`."""
+    rows = []
+    for key in sorted(_months):
+        income = sum(_months[key].get("income", {}).values())
+        expense = sum(_months[key].get("expense", {}).values())
+        rows.append({"Month": key, "income": income / 100, "expense": expense / 100, "savings": (income - expense) / 100})
+    return pd.DataFrame(rows, columns=["Month", "income", "expense", "savings"])
+
+def get_monthly_trend():
+    """Returns the income vs. expense trend from the monthly rollups (no ledger rows are read)."""
+    with _data_lock():
+        rollups = load_rollups()
+        return _trend_frame(_rollups_version(rollups), rollups["months"])
+
+def get_rollup_months():
+    """Returns (rows, months): the ledger's row count and its 'YYYY-MM' keys, from the rollups."""
+    with _data_lock():
+        rollups = load_rollups()
+        return rollups["rows"], list(rollups["months"])
+
+def get_month_totals(key):
+    """Returns month_totals(key) as a copy that later appends cannot change."""
+    with _data_lock():
+        return {trans_type: dict(amounts) for trans_type, amounts in month_totals(key).items()}
+
+def _ledger_version(path=TRANSACTIONS_FILE):
+    """Returns (size, mtime_ns) of the transactions file, or None if it is missing or empty."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_size, stat.st_mtime_ns) if stat.st_size else None
+
+@st.cache_resource(max_entries=2)
+def _export_bytes(version, export_format):
+    """The ledger exported as CSV or JSON bytes, built once per ledger `version` and format.
+
+    Rows stream from the file through a temporary file, so only the final bytes are held.
+    """
+    with tempfile.TemporaryFile() as tmp:
+        with TextIOWrapper(tmp, encoding="utf-8", newline="") as f:
+            records = export_records(iter_rows(TRANSACTIONS_FILE))
+            if export_format == "CSV":
+                write_csv(records, f)
+            else:
+                write_json(records, f)
+            f.flush()
+            tmp.seek(0)
+            return tmp.read()
+
+def _import_chunks(uploaded_file):
+    """Yields DataFrames of up to IMPORT_CHUNK_ROWS uploaded records, with the EXPORT_FIELDS columns."""
+    if uploaded_file.name.lower().endswith('.csv'):
+        yield from pd.read_csv(
+            uploaded_file, dtype=IMPORT_DTYPES, usecols=EXPORT_FIELDS,
+            keep_default_na=False, chunksize=IMPORT_CHUNK_ROWS,
+        )
+    else:
+        records = iter_json_array(TextIOWrapper(uploaded_file, encoding="utf-8"))
+        while batch := list(itertools.islice(records, IMPORT_CHUNK_ROWS)):
+            # Anything that is not an object becomes an all-missing (invalid) row
+            yield pd.DataFrame.from_records(
+                [record if isinstance(record, dict) else {} for record in batch], columns=EXPORT_FIELDS
+            )
+
+def _import_lines(chunk):
+    """Validates a chunk of uploaded records with the CLI import's validate_record().
+
+    Returns the ledger lines of the valid records and the number of invalid ones.
+    """
+    records = chunk.astype(object).where(chunk.notna(), None).to_dict("records") # Missing fields are None
+    lines = []
+    for record in records:
+        try:
+            lines.append(validate_record(record))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return lines, len(records) - len(lines)
+
+def get_recent_transactions(count):
+    """Returns the `count` newest transactions as a frame, reading only the end of the ledger."""
+    with _data_lock():
+        rows = recent_rows(limit=count)
+    _, days, types, categories, amounts, descriptions = zip(*rows) if rows else ([],) * 6
+    return pd.DataFrame({
+        "Date": (np.array(days, dtype=np.int64) - UNIX_EPOCH_ORDINAL).astype("datetime64[D]").astype("datetime64[ns]"),
+        "Type": list(types), "Category": list(categories),
+        "AmountPaisa": np.array(amounts, dtype=np.int64), "Description": list(descriptions),
+    })
 
 def get_budgets():
-    return st.session_state.budgets
+    """Returns {category: amount_paisa} from the budgets file (cached until it changes)."""
+    with _data_lock():
+        return load_budgets()
 
 def add_transaction(date, trans_type, category, amount, description):
-    new_transaction = pd.DataFrame([{
-        "Date": pd.to_datetime(date), "Type": trans_type, "Category": category, 
-        "Amount": amount, "Description": description
-    }])
-    st.session_state.transactions = pd.concat([st.session_state.transactions, new_transaction], ignore_index=True)
+    """Validates and records a transaction the way the CLI does; raises ValueError if it is invalid."""
+    with _data_lock():
+        record_transaction(trans_type, round(amount * 100), category, description, date.strftime("%Y-%m-%d"))
 
 def set_budget(category, amount):
-    st.session_state.budgets[category] = amount
+    with _data_lock():
+        get_storage().set_budget(category, round(amount * 100))
 
 # --- Page Rendering Functions ---
 
 def render_main_dashboard():
     st.title("📊 Financial Overview")
-    transactions_df = get_transactions()
+    # Served from the rollups and the end of the ledger, so the full frame is never built here
     budgets_data = get_budgets()
 
-    if transactions_df.empty:
+    if not get_rollup_months()[0]:
         st.info("👋 Welcome! Add your first transaction from the '➕ Add New Data' page to get started.")
         return
 
     st.markdown("---")
-    current_month_str = datetime.now().strftime("%B %Y")
-    current_month_df = transactions_df[transactions_df['Date'].dt.strftime("%Y-%m") == datetime.now().strftime("%Y-%m")]
+    now = datetime.now()
+    current_month_str = now.strftime("%B %Y")
     
     st.header(f"Summary for {current_month_str}")
-    total_income = current_month_df[current_month_df['Type'] == 'income']['Amount'].sum()
-    total_expenses = current_month_df[current_month_df['Type'] == 'expense']['Amount'].sum()
+    totals = get_month_totals(now.strftime("%Y-%m"))
+    total_income = sum(totals['income'].values()) / 100
+    total_expenses = sum(totals['expense'].values()) / 100
     balance = total_income - total_expenses
     
     col1, col2, col3 = st.columns(3)
@@ -77,12 +284,9 @@ def render_main_dashboard():
     with c1:
         st.subheader("Budget Status")
         if budgets_data:
-            current_month_df = transactions_df[transactions_df['Date'].dt.strftime("%Y-%m") == datetime.now().strftime("%Y-%m")]
-            for category, budgeted_amount in budgets_data.items():
-                spent_amount = current_month_df[
-                    (current_month_df['Type'] == 'expense') &
-                    (current_month_df['Category'] == category)
-                ]['Amount'].sum()
+            for category, budgeted_paisa in budgets_data.items():
+                spent_amount = totals['expense'].get(category, 0) / 100
+                budgeted_amount = budgeted_paisa / 100
                 percentage_used = (spent_amount / budgeted_amount * 100) if budgeted_amount > 0 else 0
                 
                 st.markdown(f"**{category}**")
@@ -91,7 +295,7 @@ def render_main_dashboard():
             st.info("No budgets set. Use the 'Add New Data' page.")
     with c2:
         st.subheader("Recent Transactions")
-        st.dataframe(transactions_df.sort_values(by='Date', ascending=False).head(10), use_container_width=True)
+        st.dataframe(_for_display(get_recent_transactions(10)), use_container_width=True)
 
 def render_transactions_page():
     st.title("🧾 View & Filter Transactions")
@@ -100,22 +304,22 @@ def render_transactions_page():
         st.warning("No transactions recorded yet."); return
 
     # ... (filtering logic remains the same)
-    st.data_editor(transactions_df, use_container_width=True, hide_index=True)
+    st.data_editor(_for_display(transactions_df), use_container_width=True, hide_index=True)
 
 
 def render_analytics_page():
     st.title("📈 Financial Analytics")
-    transactions_df = get_transactions()
-    if transactions_df.empty:
+    # Everything on this page comes from the monthly rollups, whatever the ledger's size
+    rows, months = get_rollup_months()
+    if not rows:
         st.warning("No transactions recorded yet. Analytics requires data."); return
 
-    transactions_df['Month'] = transactions_df['Date'].dt.to_period('M').astype(str)
-    all_months = sorted(transactions_df['Month'].unique(), reverse=True)
+    all_months = sorted(months, reverse=True)
     selected_month = st.selectbox("Select Month to Analyze", all_months)
-    month_df = transactions_df[transactions_df['Month'] == selected_month]
+    totals = get_month_totals(selected_month)
 
-    total_income = month_df[month_df['Type'] == 'income']['Amount'].sum()
-    total_expenses = month_df[month_df['Type'] == 'expense']['Amount'].sum()
+    total_income = sum(totals['income'].values()) / 100
+    total_expenses = sum(totals['expense'].values()) / 100
     net_savings = total_income - total_expenses
     savings_rate = (net_savings / total_income * 100) if total_income > 0 else 0
 
@@ -127,69 +331,48 @@ def render_analytics_page():
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("Spending by Category")
-        expense_df = month_df[month_df['Type'] == 'expense']
-        if not expense_df.empty:
-            fig = px.pie(expense_df, names='Category', values='Amount', hole=.3, title="Spending Breakdown")
+        if totals['expense']:
+            fig = px.pie(names=list(totals['expense']), values=[amount / 100 for amount in totals['expense'].values()], hole=.3, title="Spending Breakdown")
             st.plotly_chart(fig, use_container_width=True)
         else: st.info("No expenses this month.")
     with c2:
         st.subheader("Income by Source")
-        income_df = month_df[month_df['Type'] == 'income']
-        if not income_df.empty:
-            income_by_source = income_df.groupby('Category')['Amount'].sum().reset_index()
-            fig = px.bar(income_by_source, x='Category', y='Amount', title="Income Sources")
+        if totals['income']:
+            fig = px.bar(x=list(totals['income']), y=[amount / 100 for amount in totals['income'].values()], labels={'x': 'Category', 'y': 'Amount'}, title="Income Sources")
             st.plotly_chart(fig, use_container_width=True)
         else: st.info("No income this month.")
             
     st.subheader("Income vs. Expense Trend")
-    trend_df = transactions_df.groupby(['Month', 'Type'])['Amount'].sum().unstack().fillna(0).reset_index()
-    if 'income' not in trend_df: trend_df['income'] = 0
-    if 'expense' not in trend_df: trend_df['expense'] = 0
-    trend_df['savings'] = trend_df['income'] - trend_df['expense']
-    fig = px.line(trend_df, x='Month', y=['income', 'expense', 'savings'], title='Monthly Trends', markers=True)
+    fig = px.line(get_monthly_trend(), x='Month', y=['income', 'expense', 'savings'], title='Monthly Trends', markers=True)
     st.plotly_chart(fig, use_container_width=True)
 
 
 def render_data_management_page():
     st.title("💾 Data Management")
-    st.info("Export your current session data or import data from a previous session.")
+    st.info("Export your transactions or import transactions from another file.")
 
-    with st.expander("Export Session Data", expanded=True):
-        transactions_df = get_transactions()
-        if transactions_df.empty: st.info("No transactions to export.")
+    with st.expander("Export Data", expanded=True):
+        version = _ledger_version()
+        if version is None: st.info("No transactions to export.")
         else:
             export_format = st.radio("Export Format", ["CSV", "JSON"])
-            if export_format == "CSV":
-                # Convert Amount to paisa for file storage consistency
-                transactions_df['amount_paisa'] = (transactions_df['Amount'] * 100).astype(int)
-                data = transactions_df[['Date', 'Type', 'Category', 'amount_paisa', 'Description']].to_csv(index=False).encode('utf-8')
-            else:
-                transactions_df['amount_paisa'] = (transactions_df['Amount'] * 100).astype(int)
-                data = transactions_df[['Date', 'Type', 'Category', 'amount_paisa', 'Description']].to_json(orient='records', indent=4).encode('utf-8')
-            
+            data = _export_bytes(version, export_format)
             st.download_button(f"Download as {export_format}", data, f"export_{datetime.now().strftime('%Y%m%d')}.{export_format.lower()}", use_container_width=True)
 
-    with st.expander("Import Session Data"):
+    with st.expander("Import Data"):
         uploaded_file = st.file_uploader("Upload a CSV or JSON file", type=['csv', 'json'])
-        if uploaded_file and st.button("Import and Replace Data", use_container_width=True, type="primary"):
+        if uploaded_file and st.button("Import Data", use_container_width=True, type="primary"):
             try:
-                string_data = uploaded_file.getvalue().decode('utf-8')
-                new_trans_data = []
-                if uploaded_file.name.lower().endswith('.csv'):
-                    reader = csv.DictReader(StringIO(string_data))
-                    new_trans_data = [row for row in reader]
-                else:
-                    new_trans_data = json.loads(string_data)
-
-                # Create a new DataFrame from the imported data
-                imported_df = pd.DataFrame(new_trans_data)
-                imported_df['Date'] = pd.to_datetime(imported_df['date'])
-                imported_df['Amount'] = pd.to_numeric(imported_df['amount_paisa']) / 100
-                imported_df.rename(columns={'type': 'Type', 'category': 'Category', 'description': 'Description'}, inplace=True)
-                
-                # Replace session state
-                st.session_state.transactions = imported_df[['Date', 'Type', 'Category', 'Amount', 'Description']]
-                st.success(f"Successfully imported {len(st.session_state.transactions)} transactions!")
+                # Append each validated chunk to the ledger, skipping rows it already has
+                storage = get_storage()
+                added_count = skipped_count = 0
+                for chunk in _import_chunks(uploaded_file):
+                    lines, invalid_count = _import_lines(chunk)
+                    with _data_lock():
+                        added = sum(storage.append_new([line + "\n" for line in lines], [fingerprint(line) for line in lines]))
+                    added_count += added
+                    skipped_count += invalid_count + len(lines) - added
+                st.success(f"Successfully imported {added_count} transactions ({skipped_count} duplicate or invalid records skipped)!")
                 st.rerun()
 
             except Exception as e:
@@ -203,34 +386,36 @@ def render_smart_assistant_page():
         
     budgets = get_budgets()
     now = datetime.now()
-    current_month_df = transactions_df[transactions_df['Date'].dt.strftime("%Y-%m") == now.strftime("%Y-%m")]
+    current_month_df = transactions_df[transactions_df['Month'] == month_index(now)]
 
     with st.container(border=True):
         st.subheader("Spending Insights")
         expense_df = current_month_df[current_month_df['Type'] == 'expense']
+        spent_by_category = expense_df.groupby('Category', observed=True)['AmountPaisa'].sum()
         if not expense_df.empty:
-            top_category = expense_df.groupby('Category')['Amount'].sum().idxmax()
-            top_amount = expense_df.groupby('Category')['Amount'].sum().max()
+            top_category = spent_by_category.idxmax()
+            top_amount = spent_by_category.max() / 100
             st.write(f"Your top spending category this month is **{top_category}** with **₹{top_amount:,.2f}**.")
             if top_category == 'Food': st.info("💡 **Tip:** Consider planning meals for the week or looking for deals at grocery stores.")
             elif top_category == 'Shopping': st.info("💡 **Tip:** Try a 'no-spend' challenge or unsubscribe from marketing emails.")
             
-            large_expenses = expense_df[expense_df['Amount'] > expense_df['Amount'].sum() * 0.25]
+            large_expenses = expense_df[expense_df['AmountPaisa'] > expense_df['AmountPaisa'].sum() * 0.25]
             if not large_expenses.empty:
-                for _, row in large_expenses.iterrows(): st.warning(f"**Alert:** An expense of **₹{row['Amount']:,.2f}** for '{row['Description']}' seems high.")
+                for _, row in large_expenses.iterrows(): st.warning(f"**Alert:** An expense of **₹{row['AmountPaisa'] / 100:,.2f}** for '{row['Description']}' seems high.")
         else: st.write("No expenses this month to analyze.")
 
     with st.container(border=True):
         st.subheader("Savings & Budget Tips")
         three_months_ago = now - relativedelta(months=3)
-        recent_income = transactions_df[(transactions_df['Type'] == 'income') & (transactions_df['Date'] >= three_months_ago)]['Amount'].sum()
+        recent_income = transactions_df[(transactions_df['Type'] == 'income') & (transactions_df['Date'] >= three_months_ago)]['AmountPaisa'].sum() / 100
         avg_monthly_income = recent_income / 3 if recent_income > 0 else 0
         if avg_monthly_income > 0: st.write(f"Based on average income, a good monthly savings target is **₹{(avg_monthly_income * 0.15):,.2f}** (15%).")
         
         if budgets:
             all_good = True
-            for category, budget_amount in budgets.items():
-                spent = expense_df[expense_df['Category'] == category]['Amount'].sum()
+            for category, budget_paisa in budgets.items():
+                spent = spent_by_category.get(category, 0) / 100
+                budget_amount = budget_paisa / 100
                 if spent > budget_amount:
                     st.error(f"**Over budget!** You've spent **₹{(spent - budget_amount):,.2f}** too much in '{category}'.")
                     all_good = False
@@ -254,8 +439,11 @@ def render_add_data_page():
                 description = st.text_input("Description")
                 date = st.date_input("Date", datetime.now())
                 if st.form_submit_button("Add Transaction", use_container_width=True, type="primary"):
-                    add_transaction(date, trans_type, category, amount, description)
-                    st.success(f"{trans_type.capitalize()} of ₹{amount:,.2f} added!")
+                    try:
+                        add_transaction(date, trans_type, category, amount, description)
+                        st.success(f"{trans_type.capitalize()} of ₹{amount:,.2f} added!")
+                    except ValueError as e:
+                        st.error(str(e))
     with c2:
         with st.container(border=True):
             st.subheader("Set Monthly Budget")
@@ -269,13 +457,23 @@ def render_add_data_page():
 # --- Main App ---
 def main():
     apply_styling()
-    initialize_session_state()
+
+    # Screens read the text ledger and its sidecars directly, so other backends are not supported
+    try:
+        backend = get_storage().name
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+    if backend != "text":
+        st.error(f"The dashboard only reads the text ledger, but {STORAGE_ENV} is set to '{backend}'. "
+                 f"Unset {STORAGE_ENV} (or set it to 'text') and restart, or use the CLI.")
+        st.stop()
     
     with st.sidebar:
         st.title("🪙 Finance Tracker")
         page_selection = st.radio("Navigation", ["Dashboard", "Transactions", "Analytics", "Data Management", "Smart Assistant", "Add New Data"], label_visibility="collapsed")
         st.markdown("---")
-        st.info("Your data is session-based and will reset when you close this tab. Use the Data Management page to save and load your progress.")
+        st.info("Your data is read from the database/ folder and shared with the CLI.")
 
     page_map = {
         "Dashboard": render_main_dashboard, "Transactions": render_transactions_page,
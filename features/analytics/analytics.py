@@ -1,50 +1,18 @@
-from datetime import datetime
+from datetime import datetime, date
 from dateutil.relativedelta import relativedelta
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 from rich.columns import Columns
 from rich.text import Text
-from collections import defaultdict
-import os
-
-# File paths
-TRANSACTIONS_FILE = "database/transactions.txt"
-BUDGETS_FILE = "database/budgets.txt"
+from features.analytics.engine import monthly_metrics, monthly_report
+from utils.storage import get_storage
 
 # --- Helper Functions ---
 
-def _load_transactions():
-    """Loads all transactions from the file."""
-    if not os.path.exists(TRANSACTIONS_FILE):
-        return []
-    transactions = []
-    with open(TRANSACTIONS_FILE, "r") as f:
-        for line in f:
-            parts = line.strip().split(',', 4)
-            if len(parts) == 5:
-                date_str, type, category, amount_paisa, description = parts
-                transactions.append({
-                    "date": datetime.strptime(date_str, "%Y-%m-%d"),
-                    "type": type,
-                    "category": category,
-                    "amount_paisa": int(amount_paisa),
-                    "description": description
-                })
-    return transactions
-
-def _load_budgets():
-    """Loads all budgets from the file."""
-    if not os.path.exists(BUDGETS_FILE):
-        return {}
-    budgets = {}
-    with open(BUDGETS_FILE, "r") as f:
-        for line in f:
-            parts = line.strip().split(',', 1)
-            if len(parts) == 2:
-                cat, amount = parts
-                budgets[cat] = int(amount)
-    return budgets
+def _month_key(now, months_ago=0):
+    """Returns the 'YYYY-MM' key of the month `months_ago` before `now`."""
+    return (date(now.year, now.month, 1) - relativedelta(months=months_ago)).strftime("%Y-%m")
 
 def _get_trend_arrow(current, previous):
     """Returns a colored arrow indicating the trend."""
@@ -60,34 +28,20 @@ def _get_trend_arrow(current, previous):
 def spending_analysis():
     """Performs and displays spending analysis for the current month vs. last month."""
     console = Console()
-    transactions = _load_transactions()
-
-    if not transactions:
+    if get_storage().is_empty():
         console.print("[bold yellow]No transactions found to analyze.[/bold yellow]")
         return
 
     now = datetime.now()
-    current_month_start = now.replace(day=1)
-    last_month_start = (current_month_start - relativedelta(months=1)).replace(day=1)
-    
-    current_month_expenses = [
-        t for t in transactions 
-        if t['type'] == 'expense' and t['date'] >= current_month_start
-    ]
-    last_month_expenses = [
-        t for t in transactions 
-        if t['type'] == 'expense' and last_month_start <= t['date'] < current_month_start
-    ]
 
-    total_current_month_expense = sum(t['amount_paisa'] for t in current_month_expenses)
-    total_last_month_expense = sum(t['amount_paisa'] for t in last_month_expenses)
+    current, last = monthly_metrics([_month_key(now), _month_key(now, 1)], budgets={}).values()
 
-    console.print(Panel(f"[bold cyan]Spending Analysis: {now.strftime('%B %Y')}[/bold cyan]", expand=False))
+    # Breakdown by category (current month) and last month's total
+    category_spending = current['expense_by_category']
+    total_current_month_expense = current['expense']
+    total_last_month_expense = last['expense']
 
-    # Breakdown by category (current month)
-    category_spending = defaultdict(int)
-    for expense in current_month_expenses:
-        category_spending[expense['category']] += expense['amount_paisa']
+    console.print(Panel(f"[bold cyan]Spending Analysis: {now.strftime('%B %Y')}[/bold cyan]", expand=False))
 
     if total_current_month_expense > 0:
         sorted_categories = sorted(category_spending.items(), key=lambda item: item[1], reverse=True)
@@ -120,29 +74,21 @@ def spending_analysis():
 def income_analysis():
     """Performs and displays income analysis for the current month vs. last month."""
     console = Console()
-    transactions = _load_transactions()
-
-    if not transactions:
+    if get_storage().is_empty():
         console.print("[bold yellow]No transactions found to analyze.[/bold yellow]")
         return
 
     now = datetime.now()
-    current_month_start = now.replace(day=1)
-    last_month_start = (current_month_start - relativedelta(months=1)).replace(day=1)
 
-    current_month_income = [t for t in transactions if t['type'] == 'income' and t['date'] >= current_month_start]
-    last_month_income = [t for t in transactions if t['type'] == 'income' and last_month_start <= t['date'] < current_month_start]
+    current, last = monthly_metrics([_month_key(now), _month_key(now, 1)], budgets={}).values()
 
-    total_current_month_income = sum(t['amount_paisa'] for t in current_month_income)
-    total_last_month_income = sum(t['amount_paisa'] for t in last_month_income)
+    # Income by source (current month) and last month's total
+    source_income = current['income_by_category']
+    total_current_month_income = current['income']
+    total_last_month_income = last['income']
     
     console.print(Panel(f"[bold cyan]Income Analysis: {now.strftime('%B %Y')}[/bold cyan]", expand=False))
 
-    # Income by source (current month)
-    source_income = defaultdict(int)
-    for income in current_month_income:
-        source_income[income['category']] += income['amount_paisa']
-    
     if total_current_month_income > 0:
         source_text = "\n".join([f"- {source}: {amount/100:.2f}" for source, amount in source_income.items()])
         console.print(Panel(source_text, title="Income by Source", border_style="green"))
@@ -165,8 +111,7 @@ def income_analysis():
 def savings_analysis():
     """Performs and displays savings analysis, including a 3-month trend."""
     console = Console()
-    transactions = _load_transactions()
-    if not transactions:
+    if get_storage().is_empty():
         console.print("[bold yellow]No transactions found to analyze.[/bold yellow]")
         return
         
@@ -175,19 +120,14 @@ def savings_analysis():
     now = datetime.now()
     month_data = []
 
-    for i in range(3): # Current month and previous two
-        month_start = (now - relativedelta(months=i)).replace(day=1)
-        next_month_start = (month_start + relativedelta(months=1))
-        
-        month_transactions = [t for t in transactions if month_start <= t['date'] < next_month_start]
-        
-        income = sum(t['amount_paisa'] for t in month_transactions if t['type'] == 'income')
-        expense = sum(t['amount_paisa'] for t in month_transactions if t['type'] == 'expense')
-        savings = income - expense
+    month_keys = [_month_key(now, i) for i in range(3)] # Current month and previous two
+    for key, metrics in monthly_metrics(month_keys, budgets={}).items():
+        income = metrics['income']
+        savings = metrics['savings']
         savings_rate = (savings / income * 100) if income > 0 else 0
         
         month_data.append({
-            "month": month_start.strftime("%B %Y"),
+            "month": datetime.strptime(key, "%Y-%m").strftime("%B %Y"),
             "savings": savings,
             "savings_rate": savings_rate
         })
@@ -214,20 +154,16 @@ def savings_analysis():
 def financial_health_score():
     """Calculates and displays a detailed financial health score."""
     console = Console()
-    transactions = _load_transactions()
-    budgets = _load_budgets()
+    budgets = get_storage().load_budgets()
 
-    if not transactions:
+    if get_storage().is_empty():
         console.print("[bold yellow]No transactions found to calculate score.[/bold yellow]")
         return
 
     now = datetime.now()
-    current_month_start = now.replace(day=1)
-    
-    current_month_trans = [t for t in transactions if t['date'] >= current_month_start]
-    
-    income = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'income')
-    expenses = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'expense')
+    current = monthly_metrics([_month_key(now)], budgets)[_month_key(now)]
+    income = current['income']
+    expenses = current['expense']
     
     # 1. Savings Rate (30 points)
     savings = income - expenses
@@ -247,10 +183,7 @@ def financial_health_score():
     budget_adherence_score = 0
     if budgets:
         total_budgeted = sum(budgets.values())
-        total_spent_in_budgeted_cats = 0
-        for cat, budget_amt in budgets.items():
-            spent = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'expense' and t['category'] == cat)
-            total_spent_in_budgeted_cats += spent
+        total_spent_in_budgeted_cats = sum(budgets[cat] - variance for cat, variance in current['budget_variance'].items())
         
         if total_budgeted > 0:
             over_budget_pct = (total_spent_in_budgeted_cats - total_budgeted) / total_budgeted
@@ -299,10 +232,9 @@ def financial_health_score():
 def generate_monthly_report():
     """Generates a comprehensive, well-styled monthly report."""
     console = Console()
-    transactions = _load_transactions()
-    budgets = _load_budgets()
+    budgets = get_storage().load_budgets()
 
-    if not transactions:
+    if get_storage().is_empty():
         console.print("[bold yellow]No transactions found to generate report.[/bold yellow]")
         return
     
@@ -312,12 +244,10 @@ def generate_monthly_report():
     console.print(Panel(f"[bold cyan]Monthly Financial Report: {month_name}[/bold cyan]", expand=False))
 
     # Data for current month
-    current_month_start = now.replace(day=1)
-    current_month_trans = [t for t in transactions if t['date'] >= current_month_start]
-    
-    income = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'income')
-    expense = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'expense')
-    savings = income - expense
+    current = monthly_report(_month_key(now), budgets, top_n=5)
+    income = current['income']
+    expense = current['expense']
+    savings = current['savings']
 
     # 1. Overview
     overview_text = Text(f"Total Income: [green]{income/100:.2f}[/green]\n"
@@ -326,35 +256,27 @@ def generate_monthly_report():
     console.print(Panel(overview_text, title="1. Month Overview", border_style="green"))
 
     # 2. Expense & Budget Performance
-    expense_table = Table(title="Expense Breakdown", header_style="bold_magenta")
+    expense_table = Table(title="Expense Breakdown", header_style="bold magenta")
     expense_table.add_column("Category")
     expense_table.add_column("Spent", justify="right")
     expense_table.add_column("Budget", justify="right")
     expense_table.add_column("Variance", justify="right")
 
-    category_spending = defaultdict(int)
-    for exp in [t for t in current_month_trans if t['type'] == 'expense']:
-        category_spending[exp['category']] += exp['amount_paisa']
-    
-    sorted_categories = sorted(category_spending.items(), key=lambda item: item[1], reverse=True)
-
-    for category, spent_paisa in sorted_categories:
-        budget_paisa = budgets.get(category, 0)
-        variance_paisa = budget_paisa - spent_paisa
-        color = "green" if variance_paisa >= 0 else "red"
-        variance_text = f"[{color}]{variance_paisa/100:.2f}[/{color}]"
+    for row in current['categories']:
+        color = "green" if row['variance'] >= 0 else "red"
+        variance_text = f"[{color}]{row['variance']/100:.2f}[/{color}]"
         expense_table.add_row(
-            category, f"{spent_paisa/100:.2f}", 
-            f"{budget_paisa/100:.2f}" if budget_paisa > 0 else "N/A", 
+            row['category'], f"{row['spent']/100:.2f}", 
+            f"{row['budget']/100:.2f}" if row['budget'] is not None else "N/A", 
             variance_text
         )
     console.print(Panel(expense_table, title="2. Expense & Budget Performance", border_style="yellow"))
 
     # 3. Top Transactions
-    top_trans = sorted([t for t in current_month_trans if t['type'] == 'expense'], key=lambda t: t['amount_paisa'], reverse=True)[:5]
+    top_trans = current['top_expenses']
     top_trans_text = ""
     if top_trans:
-        top_trans_text = "\n".join([f"• {t['date'].strftime('%Y-%m-%d')}: {t['description']} ({t['category']}) - {t['amount_paisa']/100:.2f}" for t in top_trans])
+        top_trans_text = "\n".join([f"• {t['date']}: {t['description']} ({t['category']}) - {t['amount_paisa']/100:.2f}" for t in top_trans])
     else:
         top_trans_text = "No expenses recorded this month."
     console.print(Panel(top_trans_text, title="3. Top 5 Largest Expenses", border_style="magenta"))
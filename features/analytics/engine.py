@@ -0,0 +1,77 @@
+from utils.storage import get_storage
+
+# --- Engine ---
+
+def monthly_metrics(month_keys, budgets=None, top_n=0):
+    """Computes every per-month figure the analytics screens need, for several months at once.
+
+    Returns {month_key: metrics}, where metrics holds 'income', 'expense' and 'savings'
+    totals, 'income_by_category' and 'expense_by_category' breakdowns, the 'top_expenses'
+    records (largest first, up to `top_n`) with their storage row ids in 'top_expense_rows',
+    and 'budget_variance' ({category: budget - spent}).
+    Totals and the top-N search come from the storage backend's monthly aggregates
+    (the rollups and a vectorized scan for text files, indexed queries for SQLite).
+    """
+    storage = get_storage()
+    if budgets is None:
+        budgets = storage.load_budgets()
+
+    metrics = {}
+    for key in month_keys:
+        totals = storage.month_totals(key)
+        income_by_category = totals["income"]
+        expense_by_category = totals["expense"]
+        income = sum(income_by_category.values())
+        expense = sum(expense_by_category.values())
+        metrics[key] = {
+            "income": income,
+            "expense": expense,
+            "savings": income - expense,
+            "income_by_category": income_by_category,
+            "expense_by_category": expense_by_category,
+            "top_expenses": [],
+            "top_expense_rows": [],
+            "budget_variance": {
+                category: budget - expense_by_category.get(category, 0)
+                for category, budget in budgets.items()
+            },
+        }
+
+    if top_n > 0 and month_keys:
+        for key, top in storage.top_expenses(month_keys, top_n).items():
+            metrics[key]["top_expense_rows"] = [row_id for row_id, _ in top]
+            metrics[key]["top_expenses"] = [record for _, record in top]
+    return metrics
+
+def monthly_report(key, budgets=None, top_n=5):
+    """Returns the figures of the monthly report for a 'YYYY-MM' month, in paisa.
+
+    Holds the 'income', 'expense' and 'savings' totals, a 'categories' breakdown of
+    spending against budget (largest spend first; 'budget' is None where none is set)
+    and the `top_n` largest expenses as export records in 'top_expenses'.
+    """
+    if budgets is None:
+        budgets = get_storage().load_budgets()
+    metrics = monthly_metrics([key], budgets, top_n=top_n)[key]
+    categories = sorted(metrics["expense_by_category"].items(), key=lambda item: item[1], reverse=True)
+    return {
+        "month": key,
+        "income": metrics["income"],
+        "expense": metrics["expense"],
+        "savings": metrics["savings"],
+        "categories": [
+            {
+                "category": category, "spent": spent,
+                "budget": budgets.get(category) if budgets.get(category, 0) > 0 else None,
+                "variance": budgets.get(category, 0) - spent,
+            }
+            for category, spent in categories
+        ],
+        "top_expenses": [
+            {
+                "date": t["date"].strftime("%Y-%m-%d"), "type": t["type"], "category": t["category"],
+                "amount_paisa": t["amount_paisa"], "description": t["description"],
+            }
+            for t in metrics["top_expenses"]
+        ],
+    }
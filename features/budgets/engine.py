@@ -0,0 +1,24 @@
+from datetime import datetime
+from utils.storage import get_storage
+
+def budget_alert(category, expense_amount_paisa):
+    """Returns how a new expense stands against its category's monthly budget.
+
+    None if the category has no budget or stays under 90% of it; otherwise
+    {"status": "exceeded", "amount_paisa": overrun} or {"status": "warning", "amount_paisa": remaining}.
+    """
+    budgets = get_storage().load_budgets()
+    budgeted_amount_paisa = budgets.get(category)
+    if budgeted_amount_paisa is None:
+        return None # No budget for this category
+
+    # Current spending for the category this month is a lookup in the monthly totals
+    current_spending_paisa = get_storage().month_totals(datetime.now().strftime("%Y-%m"))["expense"].get(category, 0)
+
+    projected_spending_paisa = current_spending_paisa + expense_amount_paisa
+
+    if projected_spending_paisa > budgeted_amount_paisa:
+        return {"status": "exceeded", "amount_paisa": projected_spending_paisa - budgeted_amount_paisa}
+    if projected_spending_paisa > budgeted_amount_paisa * 0.9: # Warn at 90%
+        return {"status": "warning", "amount_paisa": budgeted_amount_paisa - projected_spending_paisa}
+    return None
@@ -1,30 +1,28 @@
 import questionary
-from datetime import datetime, timedelta
+from datetime import datetime, date
 from rich.console import Console
+from rich.table import Table
 import csv
-import json
+import itertools
 import os
-import shutil
-
-# File paths
-TRANSACTIONS_FILE = "database/transactions.txt"
-BUDGETS_FILE = "database/budgets.txt" # Future use
-BACKUPS_DIR = "backups"
+import time
+from features.data_management.engine import (
+    BACKUPS_DIR, IMPORT_CHUNK_ROWS, batch_import, batch_import_paths, create_backup, record_reader, restore_backup,
+    validate_record, write_export,
+)
+from utils.ledger import TRANSACTIONS_FILE, BUDGETS_FILE
+from utils.storage import SQLITE_FILE, get_storage
+from utils.fingerprints import fingerprint
+from utils.dates import parse_date_ordinal
+from utils.transfer import export_records
 
 def export_data():
     """Exports transactions to CSV or JSON, with date filtering."""
     console = Console()
     console.print("[bold blue]Exporting Data...[/bold blue]")
 
-    # Read transactions
-    try:
-        with open(TRANSACTIONS_FILE, "r") as f:
-            transactions = [line.strip() for line in f.readlines()]
-    except FileNotFoundError:
-        console.print("[bold yellow]No transactions found to export.[/bold yellow]")
-        return
-
-    if not transactions:
+    # Check there is something to export before asking anything
+    if get_storage().is_empty():
         console.print("[bold yellow]No transactions found to export.[/bold yellow]")
         return
 
@@ -46,47 +44,34 @@ def export_data():
         console.print("[bold red]Export cancelled.[/bold red]")
         return
 
-    # Filter transactions
-    now = datetime.now()
-    filtered_transactions = []
+    # Filter transactions (dates are day ordinals; the range is inclusive)
+    today = datetime.now().date()
     
     start_date, end_date = None, None
     if date_range_choice == "This month":
-        start_date = now.replace(day=1)
+        start_date = today.replace(day=1).toordinal()
     elif date_range_choice == "Last month":
-        end_date = now.replace(day=1) - timedelta(days=1)
-        start_date = end_date.replace(day=1)
+        end_date = today.replace(day=1).toordinal() - 1
+        start_date = date.fromordinal(end_date).replace(day=1).toordinal()
     elif date_range_choice == "This year":
-        start_date = now.replace(month=1, day=1)
+        start_date = today.replace(month=1, day=1).toordinal()
     elif date_range_choice == "Custom":
         start_str = questionary.text("Enter start date (YYYY-MM-DD):").ask()
         end_str = questionary.text("Enter end date (YYYY-MM-DD):").ask()
         try:
-            start_date = datetime.strptime(start_str, "%Y-%m-%d")
-            end_date = datetime.strptime(end_str, "%Y-%m-%d")
+            start_date = parse_date_ordinal(start_str)
+            end_date = parse_date_ordinal(end_str)
         except (ValueError, TypeError):
             console.print("[bold red]Invalid date format. Export cancelled.[/bold red]")
             return
-            
-    for line in transactions:
-        date_str = line.split(',')[0]
-        t_date = datetime.strptime(date_str, "%Y-%m-%d")
-        if (start_date and t_date < start_date) or (end_date and t_date > end_date):
-            continue
-        filtered_transactions.append(line)
 
-    if not filtered_transactions:
+    # read -> date filter -> record; pull the first record now so an empty range is caught early
+    records = export_records(get_storage().scan(start_date, None if end_date is None else end_date + 1))
+    first = next(records, None)
+    if first is None:
         console.print("[bold yellow]No transactions found in the selected date range.[/bold yellow]")
         return
-
-    # Prepare data for export
-    export_data = []
-    for line in filtered_transactions:
-        date_str, type, category, amount_paisa, description = line.split(',', 4)
-        export_data.append({
-            "date": date_str, "type": type, "category": category, 
-            "amount_paisa": int(amount_paisa), "description": description
-        })
+    records = itertools.chain([first], records)
 
     # Ask for file path and save
     output_file = questionary.text(f"Enter output file path (e.g., 'export.{export_format.lower()}'):").ask()
@@ -95,19 +80,18 @@ def export_data():
         return
 
     try:
-        if export_format == "CSV":
-            with open(output_file, "w", newline='') as f:
-                writer = csv.DictWriter(f, fieldnames=export_data[0].keys())
-                writer.writeheader()
-                writer.writerows(export_data)
-        elif export_format == "JSON":
-            with open(output_file, "w") as f:
-                json.dump(export_data, f, indent=4)
-        console.print(f"[bold green]✅ {len(export_data)} transactions exported successfully to {output_file}![/bold green]")
+        started = time.perf_counter()
+        with open(output_file, "w", newline='' if export_format == "CSV" else None) as f:
+            count = write_export(records, f, export_format)
+        elapsed = time.perf_counter() - started
+        console.print(f"[bold green]✅ {count} transactions exported successfully to {output_file}![/bold green]")
+        console.print(f"  - {count / elapsed if elapsed > 0 else count:,.0f} rows/sec")
     except (IOError, Exception) as e:
         console.print(f"[bold red]Error exporting data: {e}[/bold red]")
 
 
+# --- Import pipeline ---
+
 def import_data():
     """Imports transactions from a CSV or JSON file, skipping duplicates."""
     console = Console()
@@ -118,79 +102,113 @@ def import_data():
         console.print("[bold red]File not found or import cancelled.[/bold red]")
         return
 
-    # Load existing transactions to prevent duplicates
-    try:
-        with open(TRANSACTIONS_FILE, "r") as f:
-            existing_lines = {line.strip() for line in f.readlines()}
-    except FileNotFoundError:
-        existing_lines = set()
-
-    # Read and validate new transactions
-    new_transactions = []
-    try:
-        if file_path.lower().endswith('.csv'):
-            with open(file_path, "r", newline='') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    new_transactions.append(row)
-        elif file_path.lower().endswith('.json'):
-            with open(file_path, "r") as f:
-                new_transactions = json.load(f)
-        else:
-            console.print("[bold red]Unsupported file format. Please use CSV or JSON.[/bold red]")
-            return
-    except (IOError, json.JSONDecodeError, csv.Error) as e:
-        console.print(f"[bold red]Error reading or parsing the file: {e}[/bold red]")
+    read_records = record_reader(file_path)
+    if read_records is None:
+        console.print("[bold red]Unsupported file format. Please use CSV or JSON.[/bold red]")
         return
 
+    # Lines are matched against the ledger by 64-bit fingerprint as each batch is written
+    storage = get_storage()
     added_count = 0
     skipped_count = 0
-    
-    with open(TRANSACTIONS_FILE, "a") as f:
-        for t in new_transactions:
+    batch = []
+    fingerprints = []
+
+    def write_batch():
+        nonlocal added_count, skipped_count
+        added = sum(storage.append_new(batch, fingerprints))
+        added_count += added
+        skipped_count += len(batch) - added
+        batch.clear()
+        fingerprints.clear()
+
+    try:
+        with open(file_path, "r", newline='') as f:
             try:
-                # Basic validation
-                date_str = t['date']
-                datetime.strptime(date_str, "%Y-%m-%d") # Validate date
-                amount = int(t['amount_paisa'])
-                if amount <= 0:
-                    raise ValueError("Amount must be positive.")
-                
-                line_to_add = f"{date_str},{t['type']},{t['category']},{amount},{t['description']}"
-
-                if line_to_add in existing_lines:
-                    skipped_count += 1
-                else:
-                    f.write(line_to_add + "\n")
-                    existing_lines.add(line_to_add)
-                    added_count += 1
-            except (KeyError, ValueError) as e:
-                console.print(f"[bold yellow]Skipping invalid record: {t}. Reason: {e}[/bold yellow]")
-                skipped_count += 1
+                for t in read_records(f):
+                    try:
+                        line_to_add = validate_record(t)
+                    except (KeyError, TypeError, ValueError) as e:
+                        console.print(f"[bold yellow]Skipping invalid record: {t}. Reason: {e}[/bold yellow]")
+                        skipped_count += 1
+                        continue
+                    batch.append(line_to_add + "\n")
+                    fingerprints.append(fingerprint(line_to_add))
+                    if len(batch) >= IMPORT_CHUNK_ROWS:
+                        write_batch()
+            finally:
+                write_batch() # Rows validated before any read error are kept
+    except (IOError, ValueError, csv.Error) as e: # JSONDecodeError and UnicodeDecodeError are ValueErrors
+        console.print(f"[bold red]Error reading or parsing the file: {e}[/bold red]")
+        console.print(f"  - {added_count} transactions were added before the error.")
+        return
 
     console.print("[bold green]✅ Import complete![/bold green]")
     console.print(f"  - {added_count} new transactions added.")
     console.print(f"  - {skipped_count} duplicate or invalid records skipped.")
 
+def batch_import_data():
+    """Imports every CSV/JSON file in a directory or glob, validating the files in parallel."""
+    console = Console()
+    console.print("[bold blue]Batch Importing Data...[/bold blue]")
+
+    pattern = questionary.text("Enter a directory or glob pattern (e.g., 'statements/*.csv'):").ask()
+    if not pattern:
+        console.print("[bold red]Import cancelled.[/bold red]")
+        return
+
+    file_paths = batch_import_paths(pattern)
+    if not file_paths:
+        console.print("[bold yellow]No CSV or JSON files found.[/bold yellow]")
+        return
+
+    try:
+        results, added_count, workers, elapsed = batch_import(file_paths)
+    except IOError as e:
+        console.print(f"[bold red]Error writing transactions: {e}[/bold red]")
+        return
+
+    table = Table(title="Batch Import", show_header=True, header_style="bold magenta")
+    table.add_column("File")
+    table.add_column("Rows", justify="right")
+    table.add_column("Added", justify="right")
+    table.add_column("Duplicates", justify="right")
+    table.add_column("Invalid", justify="right")
+    table.add_column("Rows/sec", justify="right")
+    for result in results:
+        if result["error"]:
+            table.add_row(result["path"], "[red]error[/red]", "0", "-", "-", "-")
+            continue
+        rate = result["rows"] / result["seconds"] if result["seconds"] > 0 else result["rows"]
+        duplicates = result["rows"] - result["invalid"] - result["added"]
+        table.add_row(
+            result["path"], str(result["rows"]), str(result["added"]),
+            str(duplicates), str(result["invalid"]), f"{rate:,.0f}"
+        )
+    console.print(table)
+
+    for result in results:
+        if result["error"]:
+            console.print(f"[bold red]Error reading or parsing {result['path']}: {result['error']}[/bold red]")
+
+    total_rows = sum(result["rows"] for result in results)
+    console.print("[bold green]✅ Batch import complete![/bold green]")
+    console.print(f"  - {added_count} new transactions added from {len(file_paths)} files ({workers} workers).")
+    console.print(f"  - {total_rows - added_count} duplicate or invalid records skipped.")
+    console.print(f"  - {total_rows / elapsed if elapsed > 0 else total_rows:,.0f} rows/sec overall")
+
 def backup_data():
     """Creates a timestamped backup of the entire database directory."""
     console = Console()
     console.print("[bold blue]Backing up Data...[/bold blue]")
     
-    if not os.path.exists(TRANSACTIONS_FILE) and not os.path.exists(BUDGETS_FILE):
+    if not any(os.path.exists(path) for path in (TRANSACTIONS_FILE, BUDGETS_FILE, SQLITE_FILE)):
         console.print("[bold yellow]No data files found to back up.[/bold yellow]")
         return
 
     try:
-        os.makedirs(BACKUPS_DIR, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        backup_filename = os.path.join(BACKUPS_DIR, f"backup-{timestamp}")
-        
-        # Create a zip archive of the database directory
-        shutil.make_archive(backup_filename, 'zip', 'database')
-        
-        console.print(f"[bold green]✅ Backup created successfully at {backup_filename}.zip[/bold green]")
+        backup_path = create_backup()
+        console.print(f"[bold green]✅ Backup created successfully at {backup_path}[/bold green]")
 
     except Exception as e:
         console.print(f"[bold red]An error occurred during backup: {e}[/bold red]")
@@ -232,10 +250,8 @@ def restore_data():
         return
 
     try:
-        backup_path = os.path.join(BACKUPS_DIR, backup_choice)
-        
-        # Extract the zip file to the root directory, which will overwrite files in 'database/'
-        shutil.unpack_archive(backup_path, '.', 'zip')
+        # Swap the backed-up files into 'database/', overwriting the current ones
+        restore_backup(backup_choice)
         
         console.print(f"[bold green]✅ Data restored successfully from {backup_choice}[/bold green]")
         console.print("[bold yellow]It's recommended to restart the application.[/bold yellow]")
@@ -0,0 +1,164 @@
+import csv
+import glob
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from utils.dates import parse_date_ordinal
+from utils.fingerprints import fingerprint
+from utils.ledger import BUDGETS_FILE, MAX_AMOUNT_PAISA, TRANSACTIONS_FILE
+from utils.locking import file_lock
+from utils.storage import SQLITE_FILE, get_storage
+from utils.transfer import iter_json_array, write_csv, write_json
+
+# File paths
+BACKUPS_DIR = "backups"
+
+# Lines checked for duplicates and appended per write, under one ledger lock
+IMPORT_CHUNK_ROWS = 50_000
+
+# Lock files, unfinished atomic writes and SQLite journals are never backed up or restored
+TRANSIENT_SUFFIXES = (".lock", ".tmp", "-journal")
+
+# --- Export ---
+
+def write_export(records, f, export_format):
+    """Writes export records to an open text file as "CSV" or "JSON"; returns the number written."""
+    if export_format == "CSV":
+        return write_csv(records, f)
+    if export_format == "JSON":
+        return write_json(records, f)
+    raise ValueError(f"Unknown export format '{export_format}'. Use CSV or JSON.")
+
+
+# --- Import pipeline ---
+
+def validate_record(t):
+    """Returns the ledger line for an imported record, raising KeyError, TypeError or ValueError if it is invalid."""
+    # Basic validation
+    date_str = t['date']
+    parse_date_ordinal(date_str) # Validate date
+    amount = int(t['amount_paisa'])
+    if amount <= 0:
+        raise ValueError("Amount must be positive.")
+    if amount > MAX_AMOUNT_PAISA:
+        raise ValueError("Amount is too large.")
+    return f"{date_str},{t['type']},{t['category']},{amount},{t['description']}"
+
+def record_reader(file_path):
+    """Returns the streaming record reader for a file's extension, or None if it is unsupported."""
+    if file_path.lower().endswith('.csv'):
+        return csv.DictReader
+    if file_path.lower().endswith('.json'):
+        return iter_json_array
+    return None
+
+def batch_import_paths(pattern):
+    """Returns the CSV and JSON files in a directory, or matching a glob pattern, in name order."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*")
+    return sorted(
+        path for path in glob.glob(pattern)
+        if os.path.isfile(path) and record_reader(path) is not None
+    )
+
+def _parse_import_file(file_path):
+    """Reads and validates one import file; runs in a worker process during batch imports.
+
+    Returns a dict with the valid 'lines' and their 'fingerprints', the 'rows' read,
+    the 'invalid' count, the read 'error' (None on success) and the 'seconds' taken.
+    A file that fails to read contributes no lines.
+    """
+    started = time.perf_counter()
+    result = {"path": file_path, "lines": [], "fingerprints": array("Q"), "rows": 0, "invalid": 0, "error": None}
+    try:
+        with open(file_path, "r", newline='') as f:
+            for t in record_reader(file_path)(f):
+                result["rows"] += 1
+                try:
+                    line = validate_record(t)
+                except (KeyError, TypeError, ValueError):
+                    result["invalid"] += 1
+                    continue
+                result["lines"].append(line)
+                result["fingerprints"].append(fingerprint(line))
+    except (IOError, ValueError, csv.Error) as e:
+        result.update(lines=[], fingerprints=array("Q"), error=str(e))
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+def batch_import(file_paths):
+    """Imports CSV/JSON files into the ledger, validating them in parallel and skipping duplicates.
+
+    Returns (results, added, workers, seconds): one _parse_import_file() result per file
+    in order, each with its 'added' count, then the total added, the worker processes
+    used and the time taken. Raises IOError if the ledger cannot be written.
+    """
+    # Parse and validate in worker processes; results come back in file order
+    started = time.perf_counter()
+    workers = min(len(file_paths), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_import_file, file_paths))
+    else:
+        results = [_parse_import_file(path) for path in file_paths]
+
+    # De-duplicate and append chunk by chunk in file then row order; lines from earlier
+    # chunks are in the ledger by then, so duplicates across files are skipped too
+    storage = get_storage()
+    added = 0
+    for result in results:
+        lines, fingerprints = result["lines"], result["fingerprints"]
+        result["added"] = 0
+        for start in range(0, len(lines), IMPORT_CHUNK_ROWS):
+            chunk = [line + "\n" for line in lines[start:start + IMPORT_CHUNK_ROWS]]
+            result["added"] += sum(storage.append_new(chunk, fingerprints[start:start + IMPORT_CHUNK_ROWS]))
+        added += result["added"]
+        result["lines"] = result["fingerprints"] = None # Release each file's lines once merged
+
+    elapsed = time.perf_counter() - started
+    return results, added, workers, elapsed
+
+
+# --- Backup ---
+
+def create_backup():
+    """Zips the database directory into a timestamped archive under BACKUPS_DIR; returns its path."""
+    os.makedirs(BACKUPS_DIR, exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+    backup_filename = os.path.join(BACKUPS_DIR, f"backup-{timestamp}")
+    
+    # Zip the database directory's data files, with no writer midway through a file
+    database_dir = os.path.dirname(TRANSACTIONS_FILE)
+    with file_lock(TRANSACTIONS_FILE), file_lock(BUDGETS_FILE), file_lock(SQLITE_FILE):
+        with zipfile.ZipFile(f"{backup_filename}.zip", "w", zipfile.ZIP_DEFLATED) as archive:
+            for name in sorted(os.listdir(database_dir)):
+                path = os.path.join(database_dir, name)
+                if not name.endswith(TRANSIENT_SUFFIXES) and os.path.isfile(path):
+                    archive.write(path, name)
+    return f"{backup_filename}.zip"
+
+def restore_backup(backup_name):
+    """Replaces the files in the database directory with those of a backup under BACKUPS_DIR.
+
+    The archive is unpacked aside first, then each file is swapped in with os.replace()
+    while every data file is locked, so no writer appends to a file being replaced
+    and readers see either the old file or the restored one. Returns the restored names.
+    """
+    database_dir = os.path.dirname(TRANSACTIONS_FILE)
+    restored = []
+    with tempfile.TemporaryDirectory(dir=database_dir, prefix=".restore-") as staging:
+        shutil.unpack_archive(os.path.join(BACKUPS_DIR, backup_name), staging, 'zip')
+        with file_lock(TRANSACTIONS_FILE), file_lock(BUDGETS_FILE), file_lock(SQLITE_FILE):
+            for name in sorted(os.listdir(staging)):
+                # Lock files stay put: other writers may be waiting on them
+                if name.endswith(TRANSIENT_SUFFIXES) or not os.path.isfile(os.path.join(staging, name)):
+                    continue
+                os.replace(os.path.join(staging, name), os.path.join(database_dir, name))
+                restored.append(name)
+    return restored
@@ -0,0 +1,76 @@
+import questionary
+from rich.console import Console
+from rich.table import Table
+from features.diagnostics.engine import diagnostics_report, export_diagnostics
+from utils.metrics import COUNTERS, PHASES
+
+def _hit_rate(counters, name):
+    """Formats a cache's hit rate from its *_hits and *_misses counters."""
+    hits, misses = counters[f"{name}_cache_hits"], counters[f"{name}_cache_misses"]
+    return f"{hits / (hits + misses):.0%}" if hits + misses else "-"
+
+def _size(size):
+    return "missing" if size is None else f"{size / 1024:,.1f} KiB"
+
+def show_diagnostics():
+    """Displays the storage sizes, data-path counters and per-action timings of this session."""
+    console = Console()
+    report = diagnostics_report()
+    counters = report["counters"]
+
+    storage = Table(title=f"Storage: {report['storage']['backend']} ({report['storage']['rows']:,} rows)",
+                    show_header=True, header_style="bold magenta")
+    storage.add_column("File", style="dim")
+    storage.add_column("Size", justify="right")
+    for path, size in report["storage"]["files"].items():
+        storage.add_row(path, _size(size))
+    console.print(storage)
+
+    table = Table(title="Data Path Counters (this session)", show_header=True, header_style="bold magenta")
+    table.add_column("Counter", style="dim")
+    table.add_column("Value", justify="right")
+    for name in COUNTERS:
+        table.add_row(name, f"{counters[name]:,}")
+    for name in ("ledger", "budgets", "rollups"):
+        table.add_row(f"{name} cache hit rate", _hit_rate(counters, name))
+    for name, value in report["locks"].items():
+        table.add_row(f"locks {name}", f"{value:.3f}" if isinstance(value, float) else f"{value:,}")
+    console.print(table)
+
+    phases = Table(title="Time by Phase", show_header=True, header_style="bold magenta")
+    phases.add_column("Phase", style="dim")
+    phases.add_column("Time", justify="right")
+    for phase in PHASES:
+        phases.add_row(phase, f"{report['seconds'][phase] * 1000:,.1f}ms")
+    console.print(phases)
+
+    if report["actions"]:
+        actions = Table(title="Menu Actions", show_header=True, header_style="bold magenta")
+        for column in ["Action", "Runs", "Avg", *(phase.title() for phase in PHASES), "Bytes Read", "Lines Parsed"]:
+            actions.add_column(column, justify="left" if column == "Action" else "right")
+        for label, stats in report["actions"].items():
+            actions.add_row(
+                label,
+                str(stats["runs"]),
+                f"{stats['seconds'] / stats['runs'] * 1000:,.1f}ms",
+                *(f"{stats[phase] * 1000:,.1f}ms" for phase in PHASES),
+                f"{stats['bytes_read']:,}",
+                f"{stats['lines_parsed']:,}",
+            )
+        console.print(actions)
+
+    for suggestion in report["advice"]:
+        console.print(f"[bold yellow]💡 {suggestion}[/bold yellow]")
+
+def export_diagnostics_json():
+    """Saves the diagnostics report to a JSON file."""
+    console = Console()
+    output_file = questionary.text("Enter output file path (e.g., 'diagnostics.json'):").ask()
+    if not output_file:
+        console.print("[bold red]Export cancelled.[/bold red]")
+        return
+    try:
+        export_diagnostics(output_file)
+        console.print(f"[bold green]Diagnostics exported to {output_file}.[/bold green]")
+    except IOError as e:
+        console.print(f"[bold red]Error exporting diagnostics: {e}[/bold red]")
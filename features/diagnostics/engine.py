@@ -0,0 +1,66 @@
+import json
+import os
+from datetime import datetime
+from utils import metrics
+from utils.ledger import BUDGETS_FILE, TRANSACTIONS_FILE
+from utils.locking import lock_stats
+from utils.storage import SQLITE_FILE, get_storage
+
+# Sidecar files, named here so that reporting their sizes does not import their modules
+DATA_FILES = [TRANSACTIONS_FILE, BUDGETS_FILE, "database/rollups.json", "database/fingerprints.bin", SQLITE_FILE]
+
+# Text ledgers past either size are better served by the SQLite backend
+SQLITE_ADVICE_ROWS = 500_000
+SQLITE_ADVICE_BYTES = 64 * 1024 * 1024
+
+def storage_report():
+    """Returns {"backend", "rows", "files"}: the storage in use, its row count and each data file's size (None if missing)."""
+    storage = get_storage()
+    files = {path: os.path.getsize(path) if os.path.exists(path) else None for path in DATA_FILES}
+    return {"backend": storage.name, "rows": storage.count(), "files": files}
+
+def advice(storage, counters):
+    """Returns suggestions drawn from the storage report and the counters, as sentences."""
+    suggestions = []
+    ledger_bytes = storage["files"][TRANSACTIONS_FILE] or 0
+    if storage["backend"] == "text" and (storage["rows"] >= SQLITE_ADVICE_ROWS or ledger_bytes >= SQLITE_ADVICE_BYTES):
+        suggestions.append(
+            f"The ledger holds {storage['rows']:,} rows ({ledger_bytes / 2**20:.0f} MiB). Run `python main.py migrate` "
+            "and set FINANCE_STORAGE=sqlite so screens query an index instead of parsing the file."
+        )
+    if counters["lines_skipped"]:
+        suggestions.append(
+            f"Malformed ledger lines were skipped {counters['lines_skipped']:,} times while parsing; "
+            "fix or remove them so the totals include them."
+        )
+    if counters["ledger_full_parses"] > 1:
+        suggestions.append(
+            f"The ledger was parsed from scratch {counters['ledger_full_parses']} times. That happens when the file "
+            "is rewritten rather than appended to (a restore or an outside edit)."
+        )
+    return suggestions
+
+def diagnostics_report():
+    """Returns the storage report, this process's data-path counters, lock counters and advice.
+
+    The counters are copied first: counting the rows may fold new lines into the rollups,
+    and that work should not show up in the report it is part of.
+    """
+    snapshot = metrics.snapshot()
+    locks = lock_stats()
+    storage = storage_report()
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "storage": storage,
+        **snapshot,
+        "locks": locks,
+        "advice": advice(storage, snapshot["counters"]),
+    }
+
+def export_diagnostics(path):
+    """Writes diagnostics_report() to `path` as JSON; returns the report."""
+    report = diagnostics_report()
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    return report
@@ -2,46 +2,13 @@ from datetime import datetime
 from dateutil.relativedelta import relativedelta
 from rich.console import Console
 from rich.panel import Panel
-from collections import defaultdict
-import os
-
-# Assuming analytics helpers can be imported or recreated here for score calculation
-# To avoid circular dependency, we might need a shared helper module, but for now, let's redefine
-def _load_transactions_for_assistant():
-    if not os.path.exists("database/transactions.txt"):
-        return []
-    transactions = []
-    with open("database/transactions.txt", "r") as f:
-        for line in f:
-            parts = line.strip().split(',', 4)
-            if len(parts) == 5:
-                date_str, type, category, amount_paisa, description = parts
-                transactions.append({
-                    "date": datetime.strptime(date_str, "%Y-%m-%d"),
-                    "type": type, "category": category, 
-                    "amount_paisa": int(amount_paisa), "description": description
-                })
-    return transactions
-
-def _load_budgets_for_assistant():
-    if not os.path.exists("database/budgets.txt"):
-        return {}
-    budgets = {}
-    with open("database/budgets.txt", "r") as f:
-        for line in f:
-            parts = line.strip().split(',', 1)
-            if len(parts) == 2:
-                budgets[parts[0]] = int(parts[1])
-    return budgets
+from features.analytics.engine import monthly_metrics
+from utils.storage import get_storage
 
 # A simplified, self-contained health score calculation for the assistant
-def _calculate_health_score(transactions, budgets):
-    now = datetime.now()
-    current_month_start = now.replace(day=1)
-    current_month_trans = [t for t in transactions if t['date'] >= current_month_start]
-    
-    income = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'income')
-    expenses = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'expense')
+def _calculate_health_score(current, budgets):
+    income = current['income']
+    expenses = current['expense']
     
     savings = income - expenses
     savings_rate = (savings / income * 100) if income > 0 else 0
@@ -52,7 +19,7 @@ def _calculate_health_score(transactions, budgets):
     budget_adherence_score = 10 # Default partial credit
     if budgets:
         total_budgeted = sum(budgets.values())
-        spent_in_budgeted_cats = sum(t['amount_paisa'] for t in current_month_trans if t['type'] == 'expense' and t['category'] in budgets)
+        spent_in_budgeted_cats = sum(budgets[cat] - variance for cat, variance in current['budget_variance'].items())
         if total_budgeted > 0 and spent_in_budgeted_cats <= total_budgeted:
             budget_adherence_score = 25
         elif total_budgeted > 0 and spent_in_budgeted_cats > total_budgeted:
@@ -66,25 +33,21 @@ def generate_recommendations():
     console = Console()
     console.print(Panel("[bold cyan]Smart Financial Assistant[/bold cyan]", expand=False))
 
-    transactions = _load_transactions_for_assistant()
-    budgets = _load_budgets_for_assistant()
+    budgets = get_storage().load_budgets()
 
-    if not transactions:
+    if get_storage().is_empty():
         console.print("[bold yellow]No transactions found. Start by adding some income and expenses![/bold yellow]")
         return
 
     now = datetime.now()
-    current_month_start = now.replace(day=1)
-    current_month_expenses = [t for t in transactions if t['type'] == 'expense' and t['date'] >= current_month_start]
-    current_month_income = sum(t['amount_paisa'] for t in transactions if t['type'] == 'income' and t['date'] >= current_month_start)
+    current_month = now.strftime("%Y-%m")
+    # More than 25% of the month's spending fits at most 3 expenses, so the top 4 cover every alert
+    current = monthly_metrics([current_month], budgets, top_n=4)[current_month]
+    category_spending = current['expense_by_category']
 
     # --- 1. Spending Recommendations ---
     rec_panel_1_content = ""
-    if current_month_expenses:
-        category_spending = defaultdict(int)
-        for expense in current_month_expenses:
-            category_spending[expense['category']] += expense['amount_paisa']
-        
+    if category_spending:
         sorted_categories = sorted(category_spending.items(), key=lambda item: item[1], reverse=True)
         top_category, top_amount = sorted_categories[0]
         
@@ -96,8 +59,9 @@ def generate_recommendations():
         elif top_category == 'Transport':
             rec_panel_1_content += "  ↳ Could you use public transport or carpool more often?\n"
 
-        total_current_month_expense = sum(t['amount_paisa'] for t in current_month_expenses)
-        for expense in current_month_expenses:
+        total_current_month_expense = current['expense']
+        top_expenses = sorted(zip(current['top_expense_rows'], current['top_expenses']), key=lambda item: item[0])
+        for _, expense in top_expenses: # In ledger order
             if expense['amount_paisa'] > 0.25 * total_current_month_expense: # Alert if > 25%
                 rec_panel_1_content += f"• [yellow]Alert:[/yellow] A large expense of {expense['amount_paisa']/100:.2f} for '{expense['description']}' seems high.\n"
     else:
@@ -107,14 +71,14 @@ def generate_recommendations():
     # --- 2. Savings Recommendations ---
     rec_panel_2_content = ""
     three_months_ago = now - relativedelta(months=3)
-    recent_income = sum(t['amount_paisa'] for t in transactions if t['type'] == 'income' and t['date'] >= three_months_ago)
+    recent_income = get_storage().type_total("income", three_months_ago.toordinal() + 1) # Days after three_months_ago
     avg_monthly_income = recent_income / 3 if recent_income > 0 else 0
 
     if avg_monthly_income > 0:
         target_savings = avg_monthly_income * 0.15 # Suggest saving 15%
         rec_panel_2_content += f"• Based on your average income, a good monthly savings goal is around [bold green]{target_savings/100:.2f}[/bold green] (15%).\n"
         
-        current_savings = current_month_income - sum(e['amount_paisa'] for e in current_month_expenses)
+        current_savings = current['savings']
         if current_savings < target_savings:
             rec_panel_2_content += f"  ↳ You've saved {current_savings/100:.2f} so far. You are behind your target!\n"
         else:
@@ -127,7 +91,7 @@ def generate_recommendations():
     rec_panel_3_content = ""
     if budgets:
         for category, budget_amount in budgets.items():
-            spent = sum(e['amount_paisa'] for e in current_month_expenses if e['category'] == category)
+            spent = budget_amount - current['budget_variance'][category]
             if spent > budget_amount:
                 overspend = (spent - budget_amount) / 100
                 rec_panel_3_content += f"• [red]Over budget![/red] You've spent {overspend:.2f} too much in '{category}'.\n"
@@ -142,7 +106,7 @@ def generate_recommendations():
     
     # --- 4. Financial Health Tips ---
     rec_panel_4_content = ""
-    health_score = _calculate_health_score(transactions, budgets)
+    health_score = _calculate_health_score(current, budgets)
     
     rec_panel_4_content += f"• Your current financial health score is [bold]{health_score:.0f}/100[/bold].\n"
     if health_score < 50:
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+from features.budgets.engine import budget_alert
+from utils.constants import EXPENSE_CATEGORIES, INCOME_CATEGORIES
+from utils.dates import parse_date_ordinal
+from utils.storage import get_storage, transaction_record
+
+# Filters of newest_transactions(), by their label in list_transactions
+LIST_FILTERS = {
+    "All Transactions": "all",
+    "Last 7 Days": "last-7-days",
+    "Expenses Only": "expenses",
+    "Income Only": "income",
+}
+
+def _transaction_line(type, amount_paisa, category, description, date_str):
+    """Validates one transaction; returns it as an export record and as a ledger line."""
+    if type == "expense":
+        categories = EXPENSE_CATEGORIES
+    elif type == "income":
+        categories = INCOME_CATEGORIES
+    else:
+        raise ValueError(f"Unknown transaction type '{type}'. Use 'expense' or 'income'.")
+    if category not in categories:
+        raise ValueError(f"Unknown {type} category '{category}'. Choose from: {', '.join(categories)}.")
+    if not isinstance(amount_paisa, int) or isinstance(amount_paisa, bool):
+        raise ValueError("Amount must be a whole number of paisa.")
+    if amount_paisa <= 0:
+        raise ValueError("Amount must be positive.")
+    if "\n" in description or "\r" in description:
+        raise ValueError("Description must be a single line.")
+    if date_str is None:
+        date_str = datetime.now().strftime("%Y-%m-%d")
+    try:
+        parse_date_ordinal(date_str)
+    except ValueError:
+        raise ValueError("Invalid date format. Please use YYYY-MM-DD.") from None
+    record = {"date": date_str, "type": type, "category": category, "amount_paisa": amount_paisa, "description": description}
+    return record, f"{date_str},{type},{category},{amount_paisa},{description}\n"
+
+def record_transaction(type, amount_paisa, category, description="", date_str=None):
+    """Validates one transaction and appends it to the ledger; returns it as an export record.
+
+    `date_str` defaults to today. Raises ValueError for an unknown type or category,
+    a non-positive amount, a bad date or a description spanning several lines.
+    """
+    record, line = _transaction_line(type, amount_paisa, category, description, date_str)
+    get_storage().append([line])
+    return record
+
+def add_transactions(transactions, fsync=False):
+    """Validates a batch of transactions and appends them all to the ledger in one write.
+
+    `transactions` yields export records: dicts with type, category and amount_paisa, and
+    optionally description and date (today if missing). Every record is checked before
+    anything is written, so a ValueError naming the first bad record leaves the ledger
+    untouched. With `fsync`, the write is flushed to disk before returning.
+
+    Returns (records, alerts): the records as written, and {category: budget_alert()} for
+    each expense category the batch takes to 90% of its budget or over. Each category is
+    checked once, for its total in the batch against spending before the batch.
+    """
+    records, lines = [], []
+    expense_totals = {}
+    for n, transaction in enumerate(transactions, 1):
+        try:
+            record, line = _transaction_line(
+                transaction["type"], transaction["amount_paisa"], transaction["category"],
+                transaction.get("description") or "", transaction.get("date"),
+            )
+        except KeyError as e:
+            raise ValueError(f"Transaction {n}: missing {e.args[0]}.") from None
+        except ValueError as e:
+            raise ValueError(f"Transaction {n}: {e}") from None
+        records.append(record)
+        lines.append(line)
+        if record["type"] == "expense":
+            expense_totals[record["category"]] = expense_totals.get(record["category"], 0) + record["amount_paisa"]
+    if not records:
+        return [], {}
+
+    alerts = {}
+    for category, total in expense_totals.items():
+        alert = budget_alert(category, total)
+        if alert is not None:
+            alerts[category] = alert
+
+    get_storage().append(lines, fsync=fsync)
+    return records, alerts
+
+def newest_transactions(kind="all"):
+    """Returns (total, transactions) for a LIST_FILTERS filter: the number of matching
+    transactions and an iterator over them as dicts, newest first.
+
+    Rows become dicts only as the iterator is consumed, so reading one page stays cheap.
+    """
+    if kind == "last-7-days":
+        # Rows dated after the day a week ago
+        total, rows = get_storage().newest(start=(datetime.now() - timedelta(days=7)).toordinal() + 1)
+    elif kind == "all":
+        total, rows = get_storage().newest()
+    elif kind in ("expenses", "income"):
+        total, rows = get_storage().newest(type="expense" if kind == "expenses" else "income")
+    else:
+        raise ValueError(f"Unknown filter '{kind}'. Choose from: {', '.join(LIST_FILTERS.values())}.")
+    return total, map(transaction_record, rows)
+
+def month_balance(key=None):
+    """Returns the income, expense and balance (in paisa) of a 'YYYY-MM' month, this month by default."""
+    if key is None:
+        key = datetime.now().strftime("%Y-%m")
+    totals = get_storage().month_totals(key)
+    income = sum(totals["income"].values())
+    expense = sum(sum(amounts.values()) for type, amounts in totals.items() if type != "income")
+    return {"month": key, "income": income, "expense": expense, "balance": income - expense}
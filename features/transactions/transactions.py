@@ -1,12 +1,16 @@
+import itertools
 import questionary
-from datetime import datetime, timedelta
+from datetime import datetime
 from rich.console import Console
 from rich.table import Table
 from features.budgets.budgets import check_budget_alert
+from features.transactions.engine import LIST_FILTERS, month_balance, newest_transactions, record_transaction
 from utils.constants import EXPENSE_CATEGORIES, INCOME_CATEGORIES # New import
+from utils.storage import get_storage
+from utils.dates import parse_date_ordinal
 
-# File path for transactions
-TRANSACTIONS_FILE = "database/transactions.txt"
+# Rows per page in list_transactions
+PAGE_SIZE = 50
 
 def add_expense():
     """Adds an expense transaction."""
@@ -47,7 +51,7 @@ def add_expense():
 
         # Validate date format
         try:
-            datetime.strptime(date_str, "%Y-%m-%d")
+            parse_date_ordinal(date_str)
         except ValueError:
             console.print("[bold red]Invalid date format. Please use YYYY-MM-DD.[/bold red]")
             return
@@ -55,8 +59,7 @@ def add_expense():
         # Check for budget alert before saving
         check_budget_alert(category, amount_paisa)
 
-        with open(TRANSACTIONS_FILE, "a") as f:
-            f.write(f"{date_str},expense,{category},{amount_paisa},{description}\n")
+        record_transaction("expense", amount_paisa, category, description, date_str)
 
         console.print(f"[bold green]✅ Expense of {float(amount_paisa)/100:.2f} in '{category}' added successfully![/bold green]")
 
@@ -104,13 +107,12 @@ def add_income():
 
         # Validate date format
         try:
-            datetime.strptime(date_str, "%Y-%m-%d")
+            parse_date_ordinal(date_str)
         except ValueError:
             console.print("[bold red]Invalid date format. Please use YYYY-MM-DD.[/bold red]")
             return
 
-        with open(TRANSACTIONS_FILE, "a") as f:
-            f.write(f"{date_str},income,{category},{amount_paisa},{description}\n")
+        record_transaction("income", amount_paisa, category, description, date_str)
 
         console.print(f"[bold green]✅ Income of {float(amount_paisa)/100:.2f} from '{category}' added successfully![/bold green]")
 
@@ -123,10 +125,7 @@ def list_transactions():
     """Lists all transactions based on a user-selected filter."""
     console = Console()
     try:
-        with open(TRANSACTIONS_FILE, "r") as f:
-            lines = f.readlines()
-
-        if not lines:
+        if get_storage().is_empty():
             console.print("[bold yellow]No transactions found.[/bold yellow]")
             return
 
@@ -140,56 +139,45 @@ def list_transactions():
         if not filter_choice or filter_choice == "Cancel":
             console.print("[bold yellow]Operation cancelled.[/bold yellow]")
             return
-            
-        transactions = []
-        for line in lines:
-            date_str, type, category, amount_paisa, description = line.strip().split(',', 4)
-            transactions.append({
-                "date": datetime.strptime(date_str, "%Y-%m-%d"),
-                "type": type,
-                "category": category,
-                "amount_paisa": int(amount_paisa),
-                "description": description
-            })
-
-        # Apply filter
-        filtered_transactions = []
-        if filter_choice == "All Transactions":
-            filtered_transactions = transactions
-        elif filter_choice == "Last 7 Days":
-            seven_days_ago = datetime.now() - timedelta(days=7)
-            filtered_transactions = [t for t in transactions if t['date'] >= seven_days_ago]
-        elif filter_choice == "Expenses Only":
-            filtered_transactions = [t for t in transactions if t['type'] == 'expense']
-        elif filter_choice == "Income Only":
-            filtered_transactions = [t for t in transactions if t['type'] == 'income']
-
-        if not filtered_transactions:
+
+        # Matching transactions newest first, built lazily as pages are shown
+        total, transactions = newest_transactions(LIST_FILTERS[filter_choice])
+
+        if not total:
             console.print("[bold yellow]No transactions found for the selected filter.[/bold yellow]")
             return
-            
-        table = Table(title=f"Transactions ({filter_choice})", show_header=True, header_style="bold magenta")
-        table.add_column("Date", style="dim", width=12)
-        table.add_column("Type", width=8)
-        table.add_column("Category", width=15)
-        table.add_column("Description")
-        table.add_column("Amount", justify="right")
-
-        # Sort by date (newest first)
-        filtered_transactions.sort(key=lambda t: t['date'], reverse=True)
-
-        for t in filtered_transactions:
-            amount = t['amount_paisa'] / 100
-            color = "red" if t['type'] == "expense" else "green"
-            table.add_row(
-                t['date'].strftime("%Y-%m-%d"),
-                f"[{color}]{t['type'].capitalize()}[/{color}]",
-                t['category'],
-                t['description'],
-                f"[{color}]{amount:.2f}[/{color}]"
-            )
 
-        console.print(table)
+        shown = 0
+        while shown < total:
+            page = list(itertools.islice(transactions, PAGE_SIZE))
+            table = Table(
+                title=f"Transactions ({filter_choice})", caption=f"{shown + 1}-{shown + len(page)} of {total}",
+                show_header=True, header_style="bold magenta"
+            )
+            table.add_column("Date", style="dim", width=12)
+            table.add_column("Type", width=8)
+            table.add_column("Category", width=15)
+            table.add_column("Description")
+            table.add_column("Amount", justify="right")
+
+            for t in page:
+                amount = t['amount_paisa'] / 100
+                color = "red" if t['type'] == "expense" else "green"
+                table.add_row(
+                    t['date'].strftime("%Y-%m-%d"),
+                    f"[{color}]{t['type'].capitalize()}[/{color}]",
+                    t['category'],
+                    t['description'],
+                    f"[{color}]{amount:.2f}[/{color}]"
+                )
+
+            console.print(table)
+            shown += len(page)
+
+            if shown < total and not questionary.confirm(
+                f"Show the next {min(PAGE_SIZE, total - shown)}?", default=True, qmark="📄"
+            ).ask():
+                break
 
     except FileNotFoundError:
         console.print("[bold yellow]No transactions found.[/bold yellow]")
@@ -200,27 +188,12 @@ def show_balance():
     """Shows the current balance for the current month."""
     console = Console()
     try:
-        with open(TRANSACTIONS_FILE, "r") as f:
-            lines = f.readlines()
-
-        if not lines:
+        if get_storage().is_empty():
             console.print("[bold yellow]No transactions found.[/bold yellow]")
             return
 
-        total_income = 0
-        total_expense = 0
-        current_month = datetime.now().strftime("%Y-%m")
-
-        for line in lines:
-            date_str, type, _, amount_paisa, _ = line.strip().split(',', 4)
-            if date_str.startswith(current_month):
-                amount = int(amount_paisa)
-                if type == "income":
-                    total_income += amount
-                else:
-                    total_expense += amount
-
-        balance = total_income - total_expense
+        totals = month_balance()
+        total_income, total_expense, balance = totals["income"], totals["expense"], totals["balance"]
 
         console.print(f"Balance for {datetime.now().strftime('%B %Y')}:")
         console.print(f"[green]Total Income: {total_income/100:.2f}[/green]")
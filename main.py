@@ -1,96 +1,137 @@
-import questionary
-from rich.console import Console
+import importlib
+import os
+import sys
+from utils.metrics import timed, track_action
+from utils.profiling import PROFILE_ENV, profile_mode, run_profiled
 
-from features.transactions.transactions import add_expense, add_income, list_transactions, show_balance
-from features.analytics.analytics import spending_analysis, income_analysis, savings_analysis, financial_health_score, generate_monthly_report
-from features.smart_assistant.smart_assistant import generate_recommendations
-from features.data_management.data_management import export_data, import_data, backup_data, restore_data
-from features.budgets.budgets import set_budget, view_budgets # New import
+# Menu actions by label, as (module, function). A feature module is imported the first
+# time one of its actions is chosen, so the menu starts without loading every feature.
+ACTIONS = {
+    "Add Expense": ("features.transactions.transactions", "add_expense"),
+    "Add Income": ("features.transactions.transactions", "add_income"),
+    "List Transactions": ("features.transactions.transactions", "list_transactions"),
+    "Show Balance": ("features.transactions.transactions", "show_balance"),
+    "Smart Assistant": ("features.smart_assistant.smart_assistant", "generate_recommendations"),
+    "Spending Analysis": ("features.analytics.analytics", "spending_analysis"),
+    "Income Analysis": ("features.analytics.analytics", "income_analysis"),
+    "Savings Analysis": ("features.analytics.analytics", "savings_analysis"),
+    "Financial Health Score": ("features.analytics.analytics", "financial_health_score"),
+    "Generate Monthly Report": ("features.analytics.analytics", "generate_monthly_report"),
+    "Export Data": ("features.data_management.data_management", "export_data"),
+    "Import Data": ("features.data_management.data_management", "import_data"),
+    "Batch Import": ("features.data_management.data_management", "batch_import_data"),
+    "Backup Data": ("features.data_management.data_management", "backup_data"),
+    "Restore Data": ("features.data_management.data_management", "restore_data"),
+    "Set Budget": ("features.budgets.budgets", "set_budget"),
+    "View Budgets": ("features.budgets.budgets", "view_budgets"),
+    "View Diagnostics": ("features.diagnostics.diagnostics", "show_diagnostics"),
+    "Export Diagnostics": ("features.diagnostics.diagnostics", "export_diagnostics_json"),
+}
 
-def analytics_menu():
-    """Displays the analytics menu and handles user choices."""
+def run_action(label):
+    """Runs the menu action registered under `label`, importing its module if needed.
+
+    Its reads and timings are added to the Diagnostics counters (utils/metrics.py); with
+    profiling on (see utils/profiling.py) the action is also timed, import included.
+    """
+    module_name, function_name = ACTIONS[label]
+
+    def action():
+        with track_action(label):
+            with timed("import"):
+                function = getattr(importlib.import_module(module_name), function_name)
+            function()
+
+    mode = profile_mode()
+    if mode is None:
+        action()
+    else:
+        run_profiled(label, action, mode)
+
+def select(message, choices, qmark):
+    """Asks the user to pick one of `choices`; returns None if the prompt is cancelled."""
+    # Only the interactive menu needs questionary, so headless commands never import it
+    import questionary
+    return questionary.select(message, choices=choices, qmark=qmark).ask()
+
+def submenu(message, choices, qmark):
+    """Runs a submenu of registered actions until the user goes back."""
     while True:
-        choice = questionary.select(
-            "Financial Analytics Menu:",
-            choices=[
-                "Spending Analysis",
-                "Income Analysis",
-                "Savings Analysis",
-                "Financial Health Score",
-                "Generate Monthly Report",
-                "Back to Main Menu",
-            ],
-            qmark="📊"
-        ).ask()
-
-        if choice == "Spending Analysis":
-            spending_analysis()
-        elif choice == "Income Analysis":
-            income_analysis()
-        elif choice == "Savings Analysis":
-            savings_analysis()
-        elif choice == "Financial Health Score":
-            financial_health_score()
-        elif choice == "Generate Monthly Report":
-            generate_monthly_report()
-        elif choice == "Back to Main Menu" or choice is None:
+        choice = select(message, choices + ["Back to Main Menu"], qmark)
+        if choice == "Back to Main Menu" or choice is None:
             break
+        run_action(choice)
+
+def analytics_menu():
+    """Displays the analytics menu and handles user choices."""
+    submenu(
+        "Financial Analytics Menu:",
+        [
+            "Spending Analysis",
+            "Income Analysis",
+            "Savings Analysis",
+            "Financial Health Score",
+            "Generate Monthly Report",
+        ],
+        "📊"
+    )
 
 def data_management_menu():
     """Displays the data management menu and handles user choices."""
-    while True:
-        choice = questionary.select(
-            "Data Management Menu:",
-            choices=[
-                "Export Data",
-                "Import Data",
-                "Backup Data",
-                "Restore Data",
-                "Back to Main Menu",
-            ],
-            qmark="🗄️"
-        ).ask()
-
-        if choice == "Export Data":
-            export_data()
-        elif choice == "Import Data":
-            import_data()
-        elif choice == "Backup Data":
-            backup_data()
-        elif choice == "Restore Data":
-            restore_data()
-        elif choice == "Back to Main Menu" or choice is None:
-            break
+    submenu(
+        "Data Management Menu:",
+        [
+            "Export Data",
+            "Import Data",
+            "Batch Import",
+            "Backup Data",
+            "Restore Data",
+        ],
+        "🗄️"
+    )
 
 def budget_management_menu(): # New menu function
     """Displays the budget management menu and handles user choices."""
-    while True:
-        choice = questionary.select(
-            "Budget Management Menu:",
-            choices=[
-                "Set Budget",
-                "View Budgets",
-                "Back to Main Menu",
-            ],
-            qmark="💰"
-        ).ask()
-
-        if choice == "Set Budget":
-            set_budget()
-        elif choice == "View Budgets":
-            view_budgets()
-        elif choice == "Back to Main Menu" or choice is None:
-            break
+    submenu(
+        "Budget Management Menu:",
+        [
+            "Set Budget",
+            "View Budgets",
+        ],
+        "💰"
+    )
+
+def diagnostics_menu():
+    """Displays the diagnostics menu and handles user choices."""
+    submenu(
+        "Diagnostics Menu:",
+        [
+            "View Diagnostics",
+            "Export Diagnostics",
+        ],
+        "🩺"
+    )
+
+# Main menu entries that open a submenu rather than run an action
+SUBMENUS = {
+    "Financial Analytics": analytics_menu,
+    "Data Management": data_management_menu,
+    "Budget Management": budget_management_menu,
+    "Diagnostics": diagnostics_menu,
+}
 
 def main():
     """Main function to run the CLI application."""
+    from rich.console import Console
     console = Console()
     console.print("[bold cyan]Welcome to your Personal Finance Tracker![/bold cyan]")
+    if profile_mode() is not None:
+        console.print(f"[dim]Profiling menu actions ({profile_mode()}).[/dim]")
 
     while True:
-        choice = questionary.select(
+        choice = select(
             "What would you like to do?",
-            choices=[
+            [
                 "Add Expense",
                 "Add Income",
                 "List Transactions",
@@ -99,30 +140,31 @@ def main():
                 "Smart Assistant",
                 "Data Management",
                 "Budget Management", # New option
+                "Diagnostics",
                 "Exit",
             ],
-            qmark=">"
-        ).ask()
-
-        if choice == "Add Expense":
-            add_expense()
-        elif choice == "Add Income":
-            add_income()
-        elif choice == "List Transactions":
-            list_transactions()
-        elif choice == "Show Balance":
-            show_balance()
-        elif choice == "Financial Analytics":
-            analytics_menu()
-        elif choice == "Smart Assistant":
-            generate_recommendations()
-        elif choice == "Data Management":
-            data_management_menu()
-        elif choice == "Budget Management": # Call budget management menu
-            budget_management_menu()
-        elif choice == "Exit" or choice is None:
+            ">"
+        )
+
+        if choice == "Exit" or choice is None:
             console.print("[bold cyan]Goodbye![/bold cyan]")
             break
+        if choice in SUBMENUS:
+            SUBMENUS[choice]()
+        else:
+            run_action(choice)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # --profile[=time|cprofile] is shorthand for setting FINANCE_PROFILE for this run
+    for arg in [arg for arg in sys.argv[1:] if arg == "--profile" or arg.startswith("--profile=")]:
+        sys.argv.remove(arg)
+        os.environ[PROFILE_ENV] = arg.partition("=")[2] or "time"
+    try:
+        profile_mode()
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        sys.exit(2)
+    # Any other arguments select a headless subcommand (see cli.py); none starts the menu
+    if len(sys.argv) > 1:
+        sys.exit(importlib.import_module("cli").run(sys.argv[1:]))
+    main()
@@ -0,0 +1,195 @@
+# utils/aggregate.py
+
+import heapq
+import importlib.util
+from bisect import bisect_right
+from datetime import date
+from utils.ledger import EXPENSE, MAX_AMOUNT_PAISA
+from utils.metrics import timed
+
+# NumPy is optional; the pure-Python backend is always available. It is imported on the
+# first call spanning NUMPY_MIN_ROWS rows, so small folds (a single added transaction)
+# do not pay its import time.
+np = None
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+NUMPY_MIN_ROWS = 5_000
+
+# Day ordinal 1 is 0001-01-01; the civil-date arithmetic below counts from 0000-03-01
+_ORDINAL_TO_MARCH_EPOCH = 305
+
+
+def _month_key_of(month_index):
+    """Returns the 'YYYY-MM' key of a year * 12 + (month - 1) index."""
+    return f"{month_index // 12:04d}-{month_index % 12 + 1:02d}"
+
+
+# --- Pure-Python backend ---
+
+def _python_group_totals(ledger, start, stop):
+    """Sums amounts per (month, type, category) over rows `start` to `stop`."""
+    totals = {}
+    month_of_day = {}
+    dates, amounts, types, categories = ledger.dates, ledger.amounts, ledger.types, ledger.categories
+    for i in range(start, stop):
+        day = dates[i]
+        month = month_of_day.get(day)
+        if month is None:
+            d = date.fromordinal(day)
+            month = month_of_day[day] = d.year * 12 + d.month - 1
+        group = (month, types[i], categories[i])
+        totals[group] = totals.get(group, 0) + amounts[i]
+    return [
+        (_month_key_of(month), ledger.type_names[type], ledger.category_names[category], total)
+        for (month, type, category), total in totals.items()
+    ]
+
+
+def _python_top_expense_rows(ledger, bounds, top_n):
+    """Returns {key: rows of the `top_n` largest expenses} for each (start, end, key) month."""
+    bounds = sorted(bounds)
+    starts = [start for start, _, _ in bounds]
+    heaps = {key: [] for _, _, key in bounds}
+    dates, amounts, types = ledger.dates, ledger.amounts, ledger.types
+
+    for i in ledger.range_indices(bounds[0][0], bounds[-1][1]):
+        if types[i] != EXPENSE:
+            continue
+        start, end, key = bounds[bisect_right(starts, dates[i]) - 1]
+        if dates[i] >= end:
+            continue # In a gap between requested months
+        heap = heaps[key]
+        item = (amounts[i], -i)
+        if len(heap) < top_n:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    return {key: [-i for _, i in sorted(heap, reverse=True)] for key, heap in heaps.items()}
+
+
+def _python_date_disorder(ledger, start, stop, max_date):
+    """Returns (newest date, lateness) over rows `start` to `stop`, given the newest date
+    `max_date` before them. Lateness is the most any row's date falls behind the newest
+    date above it in the file."""
+    lateness = 0
+    dates = ledger.dates
+    for i in range(start, stop):
+        day = dates[i]
+        if day > max_date:
+            max_date = day
+        elif max_date - day > lateness:
+            lateness = max_date - day
+    return max_date, lateness
+
+
+# --- NumPy backend ---
+
+def _month_indices(days):
+    """Vectorized day ordinal -> year * 12 + (month - 1), using integer civil-date math."""
+    z = days.astype(np.int64) + _ORDINAL_TO_MARCH_EPOCH
+    era = z // 146097
+    doe = z - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    month = np.where(mp < 10, mp + 3, mp - 9)
+    year = yoe + era * 400 + (month <= 2)
+    return year * 12 + month - 1
+
+
+def _numpy_group_totals(ledger, start, stop):
+    """Vectorized equivalent of _python_group_totals, in the same (first-seen) order.
+
+    Falls back to the Python backend when a group's total could overflow int64.
+    """
+    if stop <= start:
+        return []
+    days = np.frombuffer(ledger.dates, dtype=np.int32)[start:stop]
+    amounts = np.frombuffer(ledger.amounts, dtype=np.int64)[start:stop]
+    if max(int(amounts.max()), -int(amounts.min())) * len(amounts) > MAX_AMOUNT_PAISA:
+        return _python_group_totals(ledger, start, stop)
+    types = np.frombuffer(ledger.types, dtype=np.uint8)[start:stop].astype(np.int64)
+    categories = np.frombuffer(ledger.categories, dtype=np.uint16)[start:stop].astype(np.int64)
+
+    n_types = len(ledger.type_names)
+    n_categories = len(ledger.category_names)
+    groups = (_month_indices(days) * n_types + types) * n_categories + categories
+    keys, first_rows, inverse = np.unique(groups, return_index=True, return_inverse=True)
+    totals = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(totals, inverse, amounts) # Exact int64 sums, unlike float bincount weights
+
+    result = []
+    for g in np.argsort(first_rows, kind="stable"):
+        key = int(keys[g])
+        month, rest = divmod(key, n_types * n_categories)
+        type, category = divmod(rest, n_categories)
+        result.append((_month_key_of(month), ledger.type_names[type], ledger.category_names[category], int(totals[g])))
+    return result
+
+
+def _numpy_top_expense_rows(ledger, bounds, top_n):
+    """Vectorized equivalent of _python_top_expense_rows."""
+    bounds = sorted(bounds)
+    rows = np.frombuffer(ledger.range_indices(bounds[0][0], bounds[-1][1]), dtype=np.uint32).astype(np.int64)
+    days = np.frombuffer(ledger.dates, dtype=np.int32)[rows]
+    amounts = np.frombuffer(ledger.amounts, dtype=np.int64)[rows]
+    is_expense = np.frombuffer(ledger.types, dtype=np.uint8)[rows] == EXPENSE
+
+    top = {}
+    for start, end, key in bounds:
+        mask = is_expense & (days >= start) & (days < end)
+        month_rows, month_amounts = rows[mask], amounts[mask]
+        if 0 < top_n < len(month_amounts):
+            # Only rows at or above the top_n-th largest amount (ties included) can make it
+            threshold = np.partition(month_amounts, len(month_amounts) - top_n)[len(month_amounts) - top_n]
+            keep = month_amounts >= threshold
+            month_rows, month_amounts = month_rows[keep], month_amounts[keep]
+        # Largest amount first; ties keep file order
+        order = np.lexsort((month_rows, -month_amounts))[:top_n]
+        top[key] = [int(i) for i in month_rows[order]]
+    return top
+
+
+def _numpy_date_disorder(ledger, start, stop, max_date):
+    """Vectorized equivalent of _python_date_disorder."""
+    days = np.frombuffer(ledger.dates, dtype=np.int32)[start:stop].astype(np.int64)
+    if not len(days):
+        return max_date, 0
+    newest = np.maximum(np.maximum.accumulate(days), max_date)
+    return int(newest[-1]), int((newest - days).max())
+
+
+# --- Backend selection ---
+
+def _load_numpy():
+    """Imports NumPy on first use; returns whether it is available."""
+    global np
+    if np is None and HAS_NUMPY:
+        import numpy as np
+    return np is not None
+
+
+def _use_numpy(rows):
+    """Whether a call spanning `rows` rows should run on the NumPy backend."""
+    return rows >= NUMPY_MIN_ROWS and _load_numpy()
+
+
+def group_totals(ledger, start, stop):
+    """Sums amounts per (month, type, category) over rows `start` to `stop`; see _python_group_totals."""
+    backend = _numpy_group_totals if _use_numpy(stop - start) else _python_group_totals
+    with timed("aggregate"):
+        return backend(ledger, start, stop)
+
+
+def top_expense_rows(ledger, bounds, top_n):
+    """Returns the rows of each month's `top_n` largest expenses; see _python_top_expense_rows."""
+    backend = _numpy_top_expense_rows if _use_numpy(len(ledger)) else _python_top_expense_rows
+    with timed("aggregate"):
+        return backend(ledger, bounds, top_n)
+
+
+def date_disorder(ledger, start, stop, max_date):
+    """Returns (newest date, lateness) over rows `start` to `stop`; see _python_date_disorder."""
+    backend = _numpy_date_disorder if _use_numpy(stop - start) else _python_date_disorder
+    with timed("aggregate"):
+        return backend(ledger, start, stop, max_date)
@@ -0,0 +1,30 @@
+# utils/dates.py
+
+from datetime import date, datetime
+
+# Memo of recently parsed date strings; ledgers repeat the same dates many times
+_ordinal_cache = {}
+_ORDINAL_CACHE_LIMIT = 4096
+
+
+def parse_date_ordinal(date_str):
+    """Returns the day ordinal of a YYYY-MM-DD date string.
+
+    Raises ValueError for anything `datetime.strptime(date_str, "%Y-%m-%d")` would reject.
+    """
+    ordinal = _ordinal_cache.get(date_str)
+    if ordinal is not None:
+        return ordinal
+
+    if (len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-' and date_str.isascii()
+            and date_str[:4].isdigit() and date_str[5:7].isdigit() and date_str[8:].isdigit()):
+        # Fixed-width fast path; date() still rejects out-of-range months and days
+        ordinal = date(int(date_str[:4]), int(date_str[5:7]), int(date_str[8:])).toordinal()
+    else:
+        # Unpadded forms such as 2025-1-5 are still accepted, as before
+        ordinal = datetime.strptime(date_str, "%Y-%m-%d").toordinal()
+
+    if len(_ordinal_cache) >= _ORDINAL_CACHE_LIMIT:
+        _ordinal_cache.clear()
+    _ordinal_cache[date_str] = ordinal
+    return ordinal
@@ -0,0 +1,156 @@
+# utils/fingerprints.py
+
+import hashlib
+import heapq
+import json
+import os
+import sys
+from array import array
+from bisect import bisect_left, insort
+from utils.ledger import TRANSACTIONS_FILE, _line_ends_at
+from utils.locking import atomic_write
+from utils.metrics import count
+
+# Sidecar holding a sorted 64-bit fingerprint of every line of the transactions file:
+# a one-line JSON header, then the fingerprints as raw native-endian uint64s
+FINGERPRINTS_FILE = "database/fingerprints.bin"
+FINGERPRINTS_VERSION = 1
+
+# In-memory copy of the sidecar, reused while the sidecar file is unchanged, so imports
+# can re-check it before every chunk they append
+_fingerprints_cache = {"path": None, "size": -1, "mtime_ns": -1, "fingerprints": None}
+
+
+def fingerprint(line):
+    """Returns a 64-bit fingerprint of a ledger line, ignoring surrounding whitespace."""
+    digest = hashlib.blake2b(line.strip().encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class Fingerprints:
+    """Sorted fingerprints of the ledger lines up to `offset`, at 8 bytes per line.
+
+    Membership is a binary search. `last_line` holds the bytes of the line ending at
+    `offset`, so the sidecar can tell whether the ledger was rewritten underneath it.
+    """
+
+    def __init__(self, values=None, offset=0, last_line=b""):
+        self.values = values if values is not None else array("Q")
+        self.offset = offset
+        self.last_line = last_line
+
+    def __len__(self):
+        return len(self.values)
+
+    def __contains__(self, value):
+        values = self.values
+        i = bisect_left(values, value)
+        return i < len(values) and values[i] == value
+
+    def merge(self, new_values):
+        """Adds fingerprints, keeping the array sorted."""
+        new_values = sorted(new_values)
+        if len(new_values) <= len(self.values) // 8:
+            for value in new_values:
+                insort(self.values, value)
+        else:
+            self.values = array("Q", heapq.merge(self.values, new_values))
+
+
+def _fingerprint_lines(f):
+    """Fingerprints the complete lines of a binary file from its current position.
+
+    Returns (fingerprints, bytes consumed, last complete line); an unfinished
+    final line is left for the next update.
+    """
+    values = array("Q")
+    consumed, last_line = 0, b""
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        values.append(fingerprint(line.decode("utf-8")))
+        consumed += len(line)
+        last_line = line
+    count("bytes_read", consumed)
+    return values, consumed, last_line
+
+
+def _read_fingerprints(path):
+    """Returns the sidecar contents, or None if it is missing or unreadable."""
+    cache = _fingerprints_cache
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if cache["path"] == path and cache["size"] == stat.st_size and cache["mtime_ns"] == stat.st_mtime_ns:
+        return cache["fingerprints"]
+    try:
+        with open(path, "rb") as f:
+            header = json.loads(f.readline())
+            values = array("Q")
+            values.frombytes(f.read())
+            count("bytes_read", f.tell())
+    except (IOError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get("version") != FINGERPRINTS_VERSION:
+        return None
+    if header.get("byteorder") != sys.byteorder or header.get("count") != len(values):
+        return None
+    fingerprints = Fingerprints(values, header["offset"], header["last_line"].encode("utf-8"))
+    cache.update(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns, fingerprints=fingerprints)
+    return fingerprints
+
+
+def _write_fingerprints(fingerprints, path):
+    """Writes the sidecar via a temporary file so readers never see a partial one."""
+    header = {
+        "version": FINGERPRINTS_VERSION,
+        "byteorder": sys.byteorder,
+        "count": len(fingerprints),
+        "offset": fingerprints.offset,
+        "last_line": fingerprints.last_line.decode("utf-8"),
+    }
+    with atomic_write(path, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        fingerprints.values.tofile(f)
+    stat = os.stat(path)
+    _fingerprints_cache.update(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns, fingerprints=fingerprints)
+
+
+def load_fingerprints(path=FINGERPRINTS_FILE, transactions_path=TRANSACTIONS_FILE):
+    """Returns the fingerprints of the transactions file, brought up to date and saved.
+
+    Appended lines are fingerprinted incrementally; everything is rebuilt if the
+    sidecar is missing or the ledger was rewritten.
+    """
+    fingerprints = _read_fingerprints(path)
+    try:
+        size = os.path.getsize(transactions_path)
+    except FileNotFoundError:
+        return Fingerprints()
+
+    if fingerprints is not None and (
+        fingerprints.offset > size or not _line_ends_at(transactions_path, fingerprints.offset, fingerprints.last_line)
+    ):
+        fingerprints = None
+    if fingerprints is not None and fingerprints.offset == size:
+        return fingerprints
+
+    with open(transactions_path, "rb") as f:
+        if fingerprints is None:
+            count("fingerprints_rebuilds")
+            values, consumed, last_line = _fingerprint_lines(f)
+            values = array("Q", sorted(values))
+            fingerprints = Fingerprints(values, consumed, last_line)
+        else:
+            f.seek(fingerprints.offset)
+            values, consumed, last_line = _fingerprint_lines(f)
+            if not consumed:
+                return fingerprints # Only an unfinished line was appended
+            fingerprints.merge(values)
+            fingerprints.offset += consumed
+            fingerprints.last_line = last_line
+
+    if os.path.isdir(os.path.dirname(path) or "."):
+        _write_fingerprints(fingerprints, path)
+    return fingerprints
@@ -0,0 +1,427 @@
+# utils/ledger.py
+
+import os
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from utils.constants import EXPENSE_CATEGORIES, INCOME_CATEGORIES
+from utils.dates import parse_date_ordinal
+from utils.locking import atomic_write, file_lock
+from utils.metrics import count, timed
+
+# File paths
+TRANSACTIONS_FILE = "database/transactions.txt"
+BUDGETS_FILE = "database/budgets.txt"
+
+# Transaction type flags stored in Ledger.types
+EXPENSE = 0
+INCOME = 1
+TYPE_NAMES = ["expense", "income"]
+
+# Known categories get stable codes; anything else is interned after them
+CATEGORY_NAMES = list(dict.fromkeys(EXPENSE_CATEGORIES + INCOME_CATEGORIES))
+
+# Bounds of the columns' item types: amounts are int64 ('q'), type flags one byte and
+# category codes uint16 ('H'). Rows outside them are malformed, like unparseable ones.
+MIN_AMOUNT_PAISA = -2**63
+MAX_AMOUNT_PAISA = 2**63 - 1
+MAX_TYPES = 2**8
+MAX_CATEGORIES = 2**16
+
+
+def parse_amount(text):
+    """Parses an amount in paisa; raises ValueError unless it fits the int64 amounts column."""
+    amount = int(text)
+    if not MIN_AMOUNT_PAISA <= amount <= MAX_AMOUNT_PAISA:
+        raise ValueError(f"Amount {text} is out of range.")
+    return amount
+
+
+class Ledger:
+    """Column-oriented, in-memory copy of the transactions file.
+
+    Row i is spread over the parallel columns: `dates[i]` is a day ordinal,
+    `amounts[i]` the amount in paisa, `types[i]` a type flag, `categories[i]` a code
+    into `category_names` and `descriptions[i]` a code into `description_pool`.
+
+    Rows stay in file order; a date-sorted index over them is kept alongside
+    so that date ranges can be found with binary search.
+    """
+
+    def __init__(self):
+        self.dates = array('i')
+        self.amounts = array('q')
+        self.types = bytearray()
+        self.categories = array('H')
+        self.descriptions = array('I')
+        self.type_names = list(TYPE_NAMES)
+        self.category_names = list(CATEGORY_NAMES)
+        self.description_pool = []
+        self._type_codes = {name: code for code, name in enumerate(self.type_names)}
+        self._category_codes = {name: code for code, name in enumerate(self.category_names)}
+        self._description_codes = {}
+        # Date index: row numbers in date order (file order within a day), their dates,
+        # and how many rows it covers so far
+        self._order = array('I')
+        self._sorted_dates = array('i')
+        self._indexed = 0
+
+    def __len__(self):
+        return len(self.dates)
+
+    def _intern(self, codes, names, value):
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def append(self, date_ordinal, type, category, amount_paisa, description):
+        """Appends one row to every column.
+
+        Raises ValueError, leaving every column as it was, if a value does not fit its column.
+        """
+        if not MIN_AMOUNT_PAISA <= amount_paisa <= MAX_AMOUNT_PAISA:
+            raise ValueError(f"Amount {amount_paisa} is out of range.")
+        if type not in self._type_codes and len(self.type_names) >= MAX_TYPES:
+            raise ValueError(f"Too many transaction types to add '{type}'.")
+        if category not in self._category_codes and len(self.category_names) >= MAX_CATEGORIES:
+            raise ValueError(f"Too many categories to add '{category}'.")
+        self.dates.append(date_ordinal)
+        self.amounts.append(amount_paisa)
+        self.types.append(self._intern(self._type_codes, self.type_names, type))
+        self.categories.append(self._intern(self._category_codes, self.category_names, category))
+        self.descriptions.append(self._intern(self._description_codes, self.description_pool, description))
+
+    def truncate(self, size):
+        """Drops every row from `size` onwards."""
+        del self.dates[size:]
+        del self.amounts[size:]
+        del self.types[size:]
+        del self.categories[size:]
+        del self.descriptions[size:]
+        if size < self._indexed:
+            self._indexed = 0 # Rebuilt on the next range query
+
+    def type_code(self, type):
+        """Returns the flag used for `type`, or None if no row has it."""
+        return self._type_codes.get(type)
+
+    def category_code(self, category):
+        """Returns the code used for `category`, or None if no row has it."""
+        return self._category_codes.get(category)
+
+    def _update_index(self):
+        """Adds rows appended since the last range query to the date index."""
+        size = len(self.dates)
+        if self._indexed == size:
+            return
+        dates = self.dates
+        if self._indexed == 0 or size - self._indexed > self._indexed // 8:
+            # Fresh or large tail: a full sort is cheaper than many inserts (and is
+            # close to linear, as the file is mostly in date order already)
+            count("index_rebuilds")
+            order = sorted(range(size), key=dates.__getitem__)
+            self._order = array('I', order)
+            self._sorted_dates = array('i', [dates[i] for i in order])
+        else:
+            order, sorted_dates = self._order, self._sorted_dates
+            for i in range(self._indexed, size):
+                day = dates[i]
+                if day >= sorted_dates[-1]:
+                    order.append(i)
+                    sorted_dates.append(day)
+                else:
+                    # Back-dated row: slot it in after every row of the same day
+                    pos = bisect_right(sorted_dates, day)
+                    order.insert(pos, i)
+                    sorted_dates.insert(pos, day)
+        self._indexed = size
+
+    def range_indices(self, start=None, end=None):
+        """Returns the rows dated in [start, end) as row numbers in date order.
+
+        `start` and `end` are day ordinals; None leaves that side open.
+        """
+        self._update_index()
+        lo = 0 if start is None else bisect_left(self._sorted_dates, start)
+        hi = len(self._order) if end is None else bisect_left(self._sorted_dates, end)
+        return self._order[lo:hi]
+
+    def newest_indices(self, start=None, end=None):
+        """Yields the rows dated in [start, end), newest day first and in file order within a day.
+
+        That is the order of a stable newest-first sort by date, read a day at a time off
+        the date index, so taking the first few rows never touches the rest.
+        """
+        self._update_index()
+        sorted_dates, order = self._sorted_dates, self._order
+        lo = 0 if start is None else bisect_left(sorted_dates, start)
+        hi = len(order) if end is None else bisect_left(sorted_dates, end)
+        while hi > lo:
+            day_start = bisect_left(sorted_dates, sorted_dates[hi - 1], lo, hi)
+            yield from order[day_start:hi]
+            hi = day_start
+
+    def record(self, i):
+        """Returns row i as a transaction dict."""
+        return {
+            "date": datetime.fromordinal(self.dates[i]),
+            "type": self.type_names[self.types[i]],
+            "category": self.category_names[self.categories[i]],
+            "amount_paisa": self.amounts[i],
+            "description": self.description_pool[self.descriptions[i]]
+        }
+
+    def records(self, indices=None):
+        """Yields transaction dicts for `indices` (all rows by default)."""
+        for i in range(len(self)) if indices is None else indices:
+            yield self.record(i)
+
+
+# Parsed state of the transactions file, reused while the file is unchanged.
+_ledger_cache = {
+    "path": None,
+    "size": -1,
+    "mtime_ns": -1,
+    "offset": 0,          # End of the last complete (newline-terminated) line
+    "last_line": b"",     # Raw bytes of that line, to check the prefix on growth
+    "complete_rows": 0,   # Rows parsed from complete lines
+    "ledger": Ledger(),
+}
+
+_budgets_cache = {"path": None, "ino": -1, "size": -1, "mtime_ns": -1, "budgets": {}}
+
+
+def _parse_line(line, ledger):
+    """Parses one ledger line onto the end of `ledger`, skipping it if it is malformed."""
+    parts = line.strip().split(',', 4)
+    if len(parts) != 5:
+        return
+    date_str, type, category, amount_paisa, description = parts
+    try:
+        # Ledger.append range-checks the amount and codes before touching any column
+        ledger.append(parse_date_ordinal(date_str), type, category, int(amount_paisa), description)
+    except ValueError:
+        return
+
+
+def _parse_chunk(data, ledger):
+    """Parses raw ledger bytes onto the end of `ledger`.
+
+    Returns (consumed, last_line, complete_rows): the number of bytes up to and including
+    the last newline, that line's bytes, and the row count once all complete lines are in.
+    A trailing line without a newline is still parsed but not counted as consumed,
+    so it is read again once it has been finished.
+    """
+    with timed("parse"):
+        rows = len(ledger)
+        consumed = data.rfind(b"\n") + 1
+        lines = data[:consumed].split(b"\n")[:-1]
+        for line in lines:
+            _parse_line(line.decode("utf-8"), ledger)
+        complete_rows = len(ledger)
+        if consumed < len(data):
+            _parse_line(data[consumed:].decode("utf-8"), ledger)
+        parsed = len(lines) + (consumed < len(data))
+        count("bytes_read", len(data))
+        count("lines_parsed", parsed)
+        count("lines_skipped", parsed - (len(ledger) - rows))
+    last_line = lines[-1] + b"\n" if lines else b""
+    return consumed, last_line, complete_rows
+
+
+def _refresh_ledger(path):
+    """Brings the cached ledger up to date with the file on disk."""
+    cache = _ledger_cache
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        cache.update(path=path, size=-1, mtime_ns=-1, offset=0, last_line=b"", complete_rows=0, ledger=Ledger())
+        return cache
+
+    if cache["path"] == path and cache["size"] == stat.st_size and cache["mtime_ns"] == stat.st_mtime_ns:
+        count("ledger_cache_hits")
+        return cache
+
+    count("ledger_cache_misses")
+    with open(path, "rb") as f:
+        grown = cache["path"] == path and stat.st_size > cache["size"] >= 0
+        if grown and cache["offset"] > 0:
+            # Only trust the cached rows if the line they ended on is still in place
+            start = cache["offset"] - len(cache["last_line"])
+            f.seek(start)
+            grown = f.read(len(cache["last_line"])) == cache["last_line"]
+
+        if grown:
+            ledger = cache["ledger"]
+            ledger.truncate(cache["complete_rows"])
+            offset = cache["offset"]
+            f.seek(offset)
+        else:
+            count("ledger_full_parses")
+            ledger = Ledger()
+            offset = 0
+            f.seek(0)
+        data = f.read()
+
+    consumed, last_line, complete_rows = _parse_chunk(data, ledger)
+    if consumed == 0 and offset > 0:
+        last_line = cache["last_line"] # No new complete line; keep the previous one
+    cache.update(
+        path=path,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        offset=offset + consumed,
+        last_line=last_line,
+        complete_rows=complete_rows,
+        ledger=ledger,
+    )
+    return cache
+
+
+def _line_ends_at(path, offset, line):
+    """Checks that the bytes of `line` end exactly at `offset` in the file at `path`.
+
+    Sidecars built from the ledger use this to confirm the file still starts with
+    the bytes they were built from (an offset of 0 always matches).
+    """
+    if offset == 0:
+        return True
+    if offset < len(line):
+        return False
+    with open(path, "rb") as f:
+        f.seek(offset - len(line))
+        return f.read(len(line)) == line
+
+
+def load_ledger(path=TRANSACTIONS_FILE):
+    """Returns the shared Ledger, re-parsing the file only when it has changed.
+
+    The returned object is reused between calls and must be treated as read-only.
+    """
+    return _refresh_ledger(path)["ledger"]
+
+
+def iter_rows(path=TRANSACTIONS_FILE):
+    """Yields (date_str, date_ordinal, type, category, amount_paisa, description) for each
+    well-formed line, reading the file one line at a time instead of loading it."""
+    lines = skipped = read = 0
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                lines += 1
+                read += len(line)
+                parts = line.strip().split(',', 4)
+                if len(parts) != 5:
+                    skipped += 1
+                    continue
+                date_str, type, category, amount_paisa, description = parts
+                try:
+                    date_ordinal = parse_date_ordinal(date_str)
+                    amount = parse_amount(amount_paisa)
+                except ValueError:
+                    skipped += 1
+                    continue
+                yield date_str, date_ordinal, type, category, amount, description
+    finally:
+        # Counted once, when the scan ends or is abandoned; bytes are characters here
+        count("lines_parsed", lines)
+        count("lines_skipped", skipped)
+        count("bytes_read", read)
+
+
+def _parse_row(line):
+    """Parses one ledger line into an iter_rows() tuple, or returns None if it is malformed."""
+    parts = line.strip().split(',', 4)
+    if len(parts) != 5:
+        return None
+    date_str, type, category, amount_paisa, description = parts
+    try:
+        return date_str, parse_date_ordinal(date_str), type, category, parse_amount(amount_paisa), description
+    except ValueError:
+        return None
+
+
+def iter_lines_reversed(path=TRANSACTIONS_FILE, block_size=64 * 1024):
+    """Yields (end, line) for each non-empty line of the file, last line first.
+
+    `end` is the offset just past the line and its newline. The file is read in
+    blocks backwards from the end, so stopping early leaves the rest of it unread.
+    """
+    with open(path, "rb") as f:
+        pos = end = f.seek(0, os.SEEK_END)
+        newline = 0 # The last line has no newline after it in the split
+        carry = b""
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            count("bytes_read", size)
+            lines = (f.read(size) + carry).split(b"\n")
+            carry = lines[0] # May start in an earlier block
+            for line in reversed(lines[1:]):
+                if line:
+                    yield end, line.decode("utf-8")
+                end -= len(line) + newline
+                newline = 1
+        if carry:
+            yield end, carry.decode("utf-8")
+
+
+def load_transactions(path=TRANSACTIONS_FILE):
+    """Loads all transactions as a list of dicts, re-parsing the file only when it has changed."""
+    return list(load_ledger(path).records())
+
+
+def load_budgets(path=BUDGETS_FILE):
+    """Loads all budgets as a {category: amount_paisa} dict, cached until the file changes."""
+    cache = _budgets_cache
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        cache.update(path=path, ino=-1, size=-1, mtime_ns=-1, budgets={})
+        return {}
+
+    # Rewrites swap in a new file, so the inode changes even if size and mtime do not
+    if (cache["path"] != path or cache["ino"] != stat.st_ino
+            or cache["size"] != stat.st_size or cache["mtime_ns"] != stat.st_mtime_ns):
+        count("budgets_cache_misses")
+        count("bytes_read", stat.st_size)
+        budgets = {}
+        with open(path, "r") as f:
+            for line in f:
+                parts = line.strip().split(',', 1)
+                if len(parts) == 2:
+                    try:
+                        budgets[parts[0]] = int(parts[1])
+                    except ValueError:
+                        continue
+        cache.update(path=path, ino=stat.st_ino, size=stat.st_size, mtime_ns=stat.st_mtime_ns, budgets=budgets)
+    else:
+        count("budgets_cache_hits")
+    return dict(cache["budgets"])
+
+
+def _write_budgets(budgets, path):
+    with atomic_write(path) as f:
+        for cat, amount in budgets.items():
+            f.write(f"{cat},{amount}\n")
+
+
+def save_budgets(budgets, path=BUDGETS_FILE):
+    """Writes a {category: amount_paisa} dict to the budgets file, replacing its contents.
+
+    The new file is written aside and swapped in, so readers never see it half-written.
+    """
+    with file_lock(path):
+        _write_budgets(budgets, path)
+
+
+def update_budget(category, amount_paisa, path=BUDGETS_FILE):
+    """Sets one category's budget, re-reading the file under its lock so that budgets
+    set concurrently by other writers are kept."""
+    with file_lock(path):
+        budgets = load_budgets(path)
+        budgets[category] = amount_paisa
+        _write_budgets(budgets, path)
@@ -0,0 +1,102 @@
+# utils/locking.py
+#
+# Advisory locks for the files under database/, shared by every writer (the menu,
+# headless commands, cron imports and the dashboard). Each data file has its own lock,
+# held on a `<file>.lock` next to it, so appends to the ledger never wait on a budget
+# rewrite. Locks are only held for the write itself; callers validate and format rows
+# before taking one. Whole-file rewrites go through a temporary file and os.replace(),
+# so readers (which take no lock) see either the old file or the new one.
+
+import os
+import stat
+import tempfile
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError: # Windows: writes are still atomic renames, but appends are unlocked
+    fcntl = None
+
+# Counters for every lock taken in this process: how many, how many had to wait for
+# another writer, and the total time spent waiting
+_lock_stats = {"acquired": 0, "contended": 0, "wait_seconds": 0.0}
+
+
+def lock_stats():
+    """Returns a copy of this process's lock counters."""
+    return dict(_lock_stats)
+
+
+@contextmanager
+def file_lock(path):
+    """Holds the exclusive advisory lock for `path` while the block runs."""
+    with open(f"{path}.lock", "a") as lock_file:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another writer holds it: count the contention, then wait our turn
+                started = time.perf_counter()
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                _lock_stats["contended"] += 1
+                _lock_stats["wait_seconds"] += time.perf_counter() - started
+        _lock_stats["acquired"] += 1
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def append_unlocked(path, text, fsync=False):
+    """Appends `text` to the file at `path`; the caller must hold its lock."""
+    if not text:
+        return
+    with open(path, "a") as f:
+        f.write(text)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def append_text(path, text, fsync=False):
+    """Appends `text` to the file at `path` under its lock, optionally syncing it to disk."""
+    if not text:
+        return
+    with file_lock(path):
+        append_unlocked(path, text, fsync)
+
+
+def _new_file_mode(path):
+    """Returns the permission bits for a rewrite of `path`: those of the file it replaces,
+    or what open() would give a new file under the current umask."""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    """Yields a temporary file that replaces the file at `path` once the block succeeds.
+
+    The temporary file is unique to this writer, so concurrent rewrites never write into
+    each other's copy; the last one to finish wins. On error the original is left intact.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        # mkstemp() creates the file readable by its owner only
+        os.chmod(tmp_path, _new_file_mode(path))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
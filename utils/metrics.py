@@ -0,0 +1,100 @@
+# utils/metrics.py
+#
+# Always-on counters for the data path, cheap enough to leave enabled: the loaders count
+# what they read and parse per file or chunk (never per row), and a few timers split each
+# menu action's time into parsing, aggregation and the rest (rendering, prompts). The
+# Diagnostics menu shows them and exports them as JSON; together they tell when a ledger
+# has grown enough to need a clean-up or the SQLite backend. Counters cover this process
+# only and start at zero.
+
+import threading
+import time
+from contextlib import contextmanager
+
+# Counter names, in the order they are shown
+COUNTERS = [
+    "lines_parsed",            # Ledger lines parsed into rows, well-formed or not
+    "lines_skipped",           # Malformed lines left out while parsing
+    "bytes_read",              # Bytes read from the ledger, its sidecars and the budgets file
+    "ledger_cache_hits",       # load_ledger() calls answered without reading the file
+    "ledger_cache_misses",
+    "ledger_full_parses",      # Misses that re-parsed the whole file rather than its new tail
+    "budgets_cache_hits",
+    "budgets_cache_misses",
+    "rollups_cache_hits",
+    "rollups_cache_misses",
+    "rollups_rebuilds",        # Rollups recomputed from the whole ledger
+    "fingerprints_rebuilds",   # Fingerprints recomputed from the whole ledger
+    "index_rebuilds",          # Full sorts of the ledger's date index
+]
+
+# Where the time of an action goes: "import" is loading its feature module on first use,
+# and "render" whatever the action spent outside the other phases
+PHASES = ["import", "parse", "aggregate", "render"]
+
+_counters = dict.fromkeys(COUNTERS, 0)
+_seconds = dict.fromkeys(PHASES, 0.0)
+_actions = {} # {label: {"runs", "seconds", "bytes_read", "lines_parsed", and seconds per phase}}
+
+# Per thread, the time already claimed by nested timers of each open timer
+_local = threading.local()
+
+
+def count(name, n=1):
+    """Adds `n` to a counter."""
+    _counters[name] += n
+
+
+@contextmanager
+def timed(phase):
+    """Adds the time the block takes to `phase`, less time claimed by timers nested in it."""
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    stack.append(0.0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        _seconds[phase] += elapsed - stack.pop()
+        if stack:
+            stack[-1] += elapsed
+
+
+@contextmanager
+def track_action(label):
+    """Records the time, reads and parsing of the block as one run of the menu action `label`."""
+    counters, seconds = dict(_counters), dict(_seconds)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        phases = {phase: _seconds[phase] - seconds[phase] for phase in PHASES if phase != "render"}
+        phases["render"] = max(elapsed - sum(phases.values()), 0.0)
+        _seconds["render"] += phases["render"]
+        stats = _actions.setdefault(label, {"runs": 0, "seconds": 0.0, "bytes_read": 0, "lines_parsed": 0,
+                                            **dict.fromkeys(PHASES, 0.0)})
+        stats["runs"] += 1
+        stats["seconds"] += elapsed
+        stats["bytes_read"] += _counters["bytes_read"] - counters["bytes_read"]
+        stats["lines_parsed"] += _counters["lines_parsed"] - counters["lines_parsed"]
+        for phase, value in phases.items():
+            stats[phase] += value
+
+
+def snapshot():
+    """Returns a copy of every counter: {"counters", "seconds" (by phase), "actions" (by label)}."""
+    return {
+        "counters": dict(_counters),
+        "seconds": dict(_seconds),
+        "actions": {label: dict(stats) for label, stats in _actions.items()},
+    }
+
+
+def reset():
+    """Sets every counter back to zero."""
+    _counters.update(dict.fromkeys(COUNTERS, 0))
+    _seconds.update(dict.fromkeys(PHASES, 0.0))
+    _actions.clear()
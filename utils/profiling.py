@@ -0,0 +1,92 @@
+# utils/profiling.py
+#
+# Opt-in profiling of menu actions, for finding out why a screen is slow without editing
+# code. Enabled with `python main.py --profile[=cprofile]` or the FINANCE_PROFILE environment
+# variable: "time" prints each action's wall-clock time after it finishes; "cprofile" also
+# runs it under cProfile, writes the stats to PROFILES_DIR (open them with
+# `python -m pstats FILE`) and prints the functions with the most cumulative time.
+
+import os
+import time
+from datetime import datetime
+
+PROFILE_ENV = "FINANCE_PROFILE"
+PROFILE_MODES = ["time", "cprofile"]
+PROFILES_DIR = "profiles"
+
+# Functions listed in the summary after a cProfile run
+SUMMARY_FUNCTIONS = 8
+
+# Built-ins that run a module's code when it is first imported
+IMPORT_BUILTINS = {"<built-in method builtins.exec>", "<built-in method builtins.compile>"}
+
+
+def profile_mode():
+    """Returns the profiling mode set in FINANCE_PROFILE, or None when profiling is off."""
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if mode in ("", "0", "off"):
+        return None
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown {PROFILE_ENV} '{mode}'. Use one of: {', '.join(PROFILE_MODES)}.")
+    return mode
+
+
+def _profile_path(label):
+    """Returns a new timestamped .prof path under PROFILES_DIR for the action `label`."""
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    slug = "-".join(label.lower().split())
+    return os.path.join(PROFILES_DIR, f"{slug}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.prof")
+
+
+def _is_noise(filename, function):
+    """Whether a profile entry is profiler or import machinery rather than the action's own code."""
+    return (
+        function == "<module>"
+        or filename.startswith("<frozen")
+        or os.path.basename(filename) == "__init__.py" and "importlib" in filename
+        or filename == "~" and ("_lsprof" in function or function in IMPORT_BUILTINS)
+    )
+
+
+def _summary(stats, limit=SUMMARY_FUNCTIONS):
+    """Returns lines naming the `limit` functions with the most cumulative time.
+
+    The first entry is the action itself, so it is left out along with import machinery.
+    """
+    entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[1:]
+    lines = []
+    for (filename, line, function), (_, calls, _, cumulative, _) in entries:
+        if _is_noise(filename, function):
+            continue
+        # Two path components are enough to tell features/analytics/engine.py from utils/...
+        where = function if filename == "~" else f"{os.path.join(*filename.split(os.sep)[-2:])}:{line}({function})"
+        lines.append(f"  {cumulative * 1000:9.1f}ms {calls:>8} calls  {where}")
+        if len(lines) == limit:
+            break
+    return lines
+
+
+def run_profiled(label, fn, mode):
+    """Runs `fn` for the menu action `label` under the profiling `mode`; returns its result.
+
+    The summary is printed even if `fn` raises.
+    """
+    profiler = None
+    if mode == "cprofile":
+        import cProfile
+        profiler = cProfile.Profile()
+    started = time.perf_counter()
+    try:
+        if profiler is None:
+            return fn()
+        return profiler.runcall(fn)
+    finally:
+        elapsed = time.perf_counter() - started
+        print(f"\n⏱️  {label}: {elapsed * 1000:.1f}ms")
+        if profiler is not None:
+            import pstats
+            path = _profile_path(label)
+            stats = pstats.Stats(profiler)
+            stats.dump_stats(path)
+            print("\n".join(_summary(stats)))
+            print(f"  Profile saved to {path}")
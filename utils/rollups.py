@@ -0,0 +1,179 @@
+# utils/rollups.py
+
+import heapq
+import json
+import os
+from utils.ledger import TRANSACTIONS_FILE, Ledger, _line_ends_at, _parse_chunk, _parse_row, _refresh_ledger, iter_lines_reversed
+from utils.aggregate import date_disorder, group_totals
+from utils.locking import atomic_write
+from utils.metrics import count
+
+# Sidecar holding per-month, per-type, per-category totals of the transactions file
+ROLLUPS_FILE = "database/rollups.json"
+ROLLUPS_VERSION = 2
+
+# In-memory copy of the sidecar, reused while the sidecar file is unchanged
+_rollups_cache = {"path": None, "size": -1, "mtime_ns": -1, "rollups": None}
+
+
+def _empty_rollups():
+    return {
+        "version": ROLLUPS_VERSION, "offset": 0, "rows": 0, "last_line": "", "months": {},
+        # Newest date folded so far, and the most any row's date fell behind the newest
+        # date above it in the file; recent_rows() uses these to stop reading early
+        "max_date": 0, "max_lateness": 0,
+    }
+
+
+def _fold(rollups, ledger, start=0, stop=None):
+    """Adds ledger rows `start` to `stop` (the end by default) into the rollup totals."""
+    if stop is None:
+        stop = len(ledger)
+    months = rollups["months"]
+    for key, type, category, amount in group_totals(ledger, start, stop):
+        totals = months.setdefault(key, {}).setdefault(type, {})
+        totals[category] = totals.get(category, 0) + amount
+    rollups["max_date"], lateness = date_disorder(ledger, start, stop, rollups["max_date"])
+    rollups["max_lateness"] = max(rollups["max_lateness"], lateness)
+    rollups["rows"] += stop - start
+
+
+def _is_prefix_of(rollups, transactions_path, size):
+    """Checks that the ledger still starts with the bytes the rollups were built from."""
+    offset = rollups["offset"]
+    if offset > size:
+        return False
+    return _line_ends_at(transactions_path, offset, rollups["last_line"].encode("utf-8"))
+
+
+def _read_rollups(path):
+    """Returns the sidecar contents, or None if it is missing or unreadable."""
+    cache = _rollups_cache
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if cache["path"] == path and cache["size"] == stat.st_size and cache["mtime_ns"] == stat.st_mtime_ns:
+        count("rollups_cache_hits")
+        return cache["rollups"]
+    count("rollups_cache_misses")
+    count("bytes_read", stat.st_size)
+    try:
+        with open(path, "r") as f:
+            rollups = json.load(f)
+    except (IOError, ValueError):
+        return None
+    if not isinstance(rollups, dict) or rollups.get("version") != ROLLUPS_VERSION:
+        return None
+    cache.update(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns, rollups=rollups)
+    return rollups
+
+
+def _write_rollups(rollups, path):
+    """Writes the sidecar via a temporary file so readers never see a partial one."""
+    with atomic_write(path) as f:
+        json.dump(rollups, f)
+    stat = os.stat(path)
+    _rollups_cache.update(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns, rollups=rollups)
+
+
+def _with_unfinished(rollups, tail, complete_rows):
+    """Returns the rollups with the row of an unfinished last line folded into a copy.
+
+    `tail` holds that row after its first `complete_rows` rows, as _parse_chunk() leaves
+    it. The saved rollups never include it, as the line may still change; readers of
+    the whole file (load_ledger, the original full scans) do count it.
+    """
+    if len(tail) == complete_rows:
+        return rollups
+    months = {key: {type: dict(totals) for type, totals in types.items()} for key, types in rollups["months"].items()}
+    partial = {**rollups, "months": months}
+    _fold(partial, tail, complete_rows)
+    return partial
+
+
+def rebuild_rollups(path=ROLLUPS_FILE, transactions_path=TRANSACTIONS_FILE):
+    """Recomputes the rollups from the whole transactions file and saves them."""
+    count("rollups_rebuilds")
+    rollups = _empty_rollups()
+    state = _refresh_ledger(transactions_path)
+    _fold(rollups, state["ledger"], stop=state["complete_rows"])
+    rollups.update(offset=state["offset"], last_line=state["last_line"].decode("utf-8"))
+    if os.path.isdir(os.path.dirname(path) or "."):
+        _write_rollups(rollups, path)
+    return _with_unfinished(rollups, state["ledger"], state["complete_rows"])
+
+
+def load_rollups(path=ROLLUPS_FILE, transactions_path=TRANSACTIONS_FILE):
+    """Returns the rollups, brought up to date with the transactions file.
+
+    Appended lines are folded in incrementally; the rollups are rebuilt from
+    scratch if the sidecar is missing or the ledger was rewritten.
+    """
+    rollups = _read_rollups(path)
+    try:
+        size = os.path.getsize(transactions_path)
+    except FileNotFoundError:
+        size = 0
+
+    if rollups is None or not _is_prefix_of(rollups, transactions_path, size):
+        return rebuild_rollups(path, transactions_path)
+    if rollups["offset"] == size:
+        return rollups
+
+    with open(transactions_path, "rb") as f:
+        f.seek(rollups["offset"])
+        data = f.read()
+    tail = Ledger()
+    consumed, last_line, complete_rows = _parse_chunk(data, tail)
+    if consumed:
+        _fold(rollups, tail, stop=complete_rows)
+        rollups.update(offset=rollups["offset"] + consumed, last_line=last_line.decode("utf-8"))
+        _write_rollups(rollups, path)
+    return _with_unfinished(rollups, tail, complete_rows)
+
+
+def update_rollups(path=ROLLUPS_FILE, transactions_path=TRANSACTIONS_FILE):
+    """Folds newly appended transactions into the persisted rollups."""
+    load_rollups(path, transactions_path)
+
+
+def month_totals(key, path=ROLLUPS_FILE, transactions_path=TRANSACTIONS_FILE):
+    """Returns {type: {category: amount_paisa}} for a 'YYYY-MM' month.
+
+    Both 'income' and 'expense' are always present. The inner dicts are shared
+    with the cache and must not be modified.
+    """
+    return {"income": {}, "expense": {}, **load_rollups(path, transactions_path)["months"].get(key, {})}
+
+
+def recent_rows(start=None, limit=None, path=ROLLUPS_FILE, transactions_path=TRANSACTIONS_FILE):
+    """Returns the newest iter_rows() tuples of the transactions file: those dated on or
+    after day ordinal `start`, capped at the `limit` newest. Rows come newest day first
+    and in file order within a day.
+
+    The file is read backwards from the end. No row dates more than the rollups'
+    `max_lateness` days behind any row above it, so the scan stops at the first folded
+    row older than the oldest row still wanted by more than that.
+    """
+    if not os.path.exists(transactions_path):
+        return []
+    rollups = load_rollups(path, transactions_path)
+    lateness, folded = rollups["max_lateness"], rollups["offset"]
+    wanted = [] # Heap of (date_ordinal, -end, row), oldest (and latest in the file) first
+    for end, line in iter_lines_reversed(transactions_path):
+        row = _parse_row(line)
+        if row is None:
+            continue
+        item = (row[1], -end, row)
+        if start is not None and row[1] < start:
+            pass
+        elif limit is None or len(wanted) < limit:
+            heapq.heappush(wanted, item)
+        elif item > wanted[0]:
+            heapq.heapreplace(wanted, item)
+
+        cutoff = wanted[0][0] if limit is not None and len(wanted) >= limit else start
+        if cutoff is not None and row[1] < cutoff - lateness and end <= folded:
+            break
+    return [row for _, _, row in sorted(wanted, reverse=True)]
@@ -0,0 +1,266 @@
+# utils/sqlite_storage.py
+#
+# SQLite storage backend: transactions and budgets in one database file, with indexes
+# on (date) and (type, category, date) so range scans, monthly totals and top-N queries
+# run in SQL instead of over every row, and on (fingerprint) for import de-duplication. Selected with FINANCE_STORAGE=sqlite; see
+# utils/storage.py. Writes take the same advisory lock as the text files (utils/locking.py),
+# so backups and restores never copy the database midway through a write.
+
+import os
+import sqlite3
+import threading
+from array import array
+from utils.fingerprints import Fingerprints, fingerprint
+from utils.ledger import BUDGETS_FILE, TRANSACTIONS_FILE, _parse_row, load_budgets
+from utils.locking import file_lock
+from utils.metrics import timed
+from utils.storage import SQLITE_FILE, Storage, _new_line_flags, month_bounds, transaction_record
+
+# Rows inserted per statement batch while migrating
+MIGRATE_BATCH_ROWS = 50_000
+
+# Fingerprints looked up per query when checking an import for duplicates
+LOOKUP_BATCH = 500
+
+# Fingerprints are unsigned 64-bit; SQLite integers are signed, so they are stored shifted
+_FINGERPRINT_SHIFT = 1 << 63
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    date_text TEXT NOT NULL,
+    date INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT NOT NULL,
+    amount_paisa INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    fingerprint INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS budgets (
+    category TEXT PRIMARY KEY,
+    amount_paisa INTEGER NOT NULL
+);
+"""
+
+INDEXES = [
+    "CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date)",
+    "CREATE INDEX IF NOT EXISTS transactions_type_category_date ON transactions (type, category, date)",
+    "CREATE INDEX IF NOT EXISTS transactions_fingerprint ON transactions (fingerprint)",
+]
+
+_ROW_COLUMNS = "date_text, date, type, category, amount_paisa, description"
+_INSERT = f"INSERT INTO transactions ({_ROW_COLUMNS}, fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?)"
+
+
+def _insert_values(lines):
+    """Yields the transactions table values of each well-formed ledger line."""
+    for line in lines:
+        row = _parse_row(line)
+        if row is not None:
+            yield (*row, fingerprint(line) - _FINGERPRINT_SHIFT)
+
+
+def _insert_lines(connection, lines):
+    """Inserts the well-formed lines of a batch; returns how many were inserted."""
+    values = list(_insert_values(lines))
+    connection.executemany(_INSERT, values)
+    return len(values)
+
+
+def _range_clause(start, end):
+    """Returns the SQL condition and parameters selecting dates in [start, end)."""
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("date >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("date < ?")
+        params.append(end)
+    return " AND ".join(conditions) or "1", params
+
+
+class SQLiteStorage(Storage):
+    """Transactions and budgets in an indexed SQLite database."""
+
+    name = "sqlite"
+
+    def __init__(self, path=SQLITE_FILE):
+        self.path = path
+        self._local = threading.local() # One connection per thread
+
+    def connect(self):
+        """Returns this thread's connection, creating the database schema on first use."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path) or "."
+            if not os.path.isdir(directory):
+                raise FileNotFoundError(f"No database directory '{directory}' for {self.path}.")
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.executescript(SCHEMA + ";".join(INDEXES))
+            self._local.connection = connection
+        return connection
+
+    def _insert(self, connection, lines, fsync):
+        """Inserts ledger lines in one transaction; the caller holds the write lock."""
+        if fsync:
+            connection.execute("PRAGMA synchronous = FULL")
+        try:
+            with connection:
+                connection.executemany(_INSERT, _insert_values(lines))
+        finally:
+            if fsync:
+                connection.execute("PRAGMA synchronous = NORMAL")
+
+    def append(self, lines, fsync=False):
+        connection = self.connect()
+        with file_lock(self.path):
+            self._insert(connection, lines, fsync)
+
+    def _stored_fingerprints(self, connection, fingerprints):
+        """Returns the set of `fingerprints` already stored, looked up in the fingerprint index."""
+        candidates = sorted(set(fingerprints))
+        stored = set()
+        for i in range(0, len(candidates), LOOKUP_BATCH):
+            batch = [value - _FINGERPRINT_SHIFT for value in candidates[i:i + LOOKUP_BATCH]]
+            stored.update(
+                value + _FINGERPRINT_SHIFT
+                for value, in connection.execute(
+                    f"SELECT fingerprint FROM transactions WHERE fingerprint IN ({','.join('?' * len(batch))})", batch
+                )
+            )
+        return stored
+
+    def append_new(self, lines, fingerprints, fsync=False):
+        connection = self.connect()
+        with file_lock(self.path):
+            flags = _new_line_flags(fingerprints, self._stored_fingerprints(connection, fingerprints))
+            self._insert(connection, [line for line, flag in zip(lines, flags) if flag], fsync)
+        return flags
+
+    def count(self):
+        return self.connect().execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def is_empty(self):
+        return self.connect().execute("SELECT 1 FROM transactions LIMIT 1").fetchone() is None
+
+    def scan(self, start=None, end=None):
+        where, params = _range_clause(start, end)
+        yield from self.connect().execute(f"SELECT {_ROW_COLUMNS} FROM transactions WHERE {where} ORDER BY id", params)
+
+    def newest(self, start=None, type=None):
+        where, params = _range_clause(start, None)
+        if type is not None:
+            where += " AND type = ?"
+            params.append(type)
+        connection = self.connect()
+        total = connection.execute(f"SELECT COUNT(*) FROM transactions WHERE {where}", params).fetchone()[0]
+        # The date index gives the day order; only the rows of each day are sorted by id
+        rows = connection.execute(
+            f"SELECT {_ROW_COLUMNS} FROM transactions WHERE {where} ORDER BY date DESC, id", params
+        )
+        return total, rows
+
+    def month_totals(self, key):
+        start, end = month_bounds(key)
+        totals = {"income": {}, "expense": {}}
+        # Categories in order of their first row, as in the text backend's rollups
+        with timed("aggregate"):
+            for type, category, amount in self.connect().execute(
+                "SELECT type, category, SUM(amount_paisa) FROM transactions WHERE date >= ? AND date < ? "
+                "GROUP BY type, category ORDER BY MIN(id)",
+                (start, end),
+            ):
+                totals.setdefault(type, {})[category] = amount
+        return totals
+
+    def type_total(self, type, start=None, end=None):
+        where, params = _range_clause(start, end)
+        with timed("aggregate"):
+            return self.connect().execute(
+                f"SELECT COALESCE(SUM(amount_paisa), 0) FROM transactions WHERE type = ? AND {where}", [type, *params]
+            ).fetchone()[0]
+
+    def top_expenses(self, month_keys, top_n):
+        connection = self.connect()
+        top = {}
+        with timed("aggregate"):
+            for key in month_keys:
+                rows = connection.execute(
+                    f"SELECT id, {_ROW_COLUMNS} FROM transactions WHERE type = 'expense' AND date >= ? AND date < ? "
+                    "ORDER BY amount_paisa DESC, id LIMIT ?",
+                    (*month_bounds(key), top_n),
+                )
+                top[key] = [(row[0], transaction_record(row[1:])) for row in rows]
+        return top
+
+    def fingerprints(self):
+        # The shift keeps unsigned order, so the index yields them sorted, at 8 bytes a row
+        values = array("Q", (
+            value + _FINGERPRINT_SHIFT
+            for value, in self.connect().execute("SELECT fingerprint FROM transactions ORDER BY fingerprint")
+        ))
+        return Fingerprints(values)
+
+    def load_budgets(self):
+        return dict(self.connect().execute("SELECT category, amount_paisa FROM budgets ORDER BY rowid"))
+
+    def set_budget(self, category, amount_paisa):
+        connection = self.connect()
+        with file_lock(self.path), connection:
+            connection.execute(
+                "INSERT INTO budgets (category, amount_paisa) VALUES (?, ?) "
+                "ON CONFLICT (category) DO UPDATE SET amount_paisa = excluded.amount_paisa",
+                (category, amount_paisa),
+            )
+
+    def save_budgets(self, budgets):
+        connection = self.connect()
+        with file_lock(self.path), connection:
+            connection.execute("DELETE FROM budgets")
+            connection.executemany("INSERT INTO budgets (category, amount_paisa) VALUES (?, ?)", budgets.items())
+
+
+def migrate_from_text(storage=None, transactions_path=TRANSACTIONS_FILE, budgets_path=BUDGETS_FILE, replace=False):
+    """Copies the transactions and budgets text files into a SQLite backend (the default one if None).
+
+    Returns {"transactions", "skipped", "budgets", "path"}: the rows copied, the malformed
+    lines left out and the budgets copied. Raises ValueError if the database already holds
+    transactions, unless `replace` is set, in which case its contents are replaced.
+    """
+    storage = storage or SQLiteStorage()
+    connection = storage.connect()
+    with file_lock(storage.path):
+        existing = connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        if existing and not replace:
+            raise ValueError(f"{storage.path} already holds {existing} transactions. Use --replace to overwrite them.")
+
+        copied = skipped = 0
+        with connection:
+            connection.execute("DELETE FROM transactions")
+            connection.execute("DELETE FROM budgets")
+            # Building the indexes once after loading is cheaper than updating them per row
+            connection.execute("DROP INDEX IF EXISTS transactions_date")
+            connection.execute("DROP INDEX IF EXISTS transactions_type_category_date")
+            connection.execute("DROP INDEX IF EXISTS transactions_fingerprint")
+            if os.path.exists(transactions_path):
+                with open(transactions_path, "r") as f:
+                    batch = []
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        batch.append(line)
+                        if len(batch) >= MIGRATE_BATCH_ROWS:
+                            inserted = _insert_lines(connection, batch)
+                            copied += inserted
+                            skipped += len(batch) - inserted
+                            batch.clear()
+                    inserted = _insert_lines(connection, batch)
+                    copied += inserted
+                    skipped += len(batch) - inserted
+            budgets = load_budgets(budgets_path)
+            connection.executemany("INSERT INTO budgets (category, amount_paisa) VALUES (?, ?)", budgets.items())
+            for statement in INDEXES:
+                connection.execute(statement)
+        connection.execute("ANALYZE")
+    return {"transactions": copied, "skipped": skipped, "budgets": len(budgets), "path": storage.path}
@@ -0,0 +1,244 @@
+# utils/storage.py
+#
+# Where transactions and budgets live. Feature code talks to a Storage backend instead
+# of the files under database/: the text files (the default) or an indexed SQLite
+# database (utils/sqlite_storage.py). The backend is picked by the FINANCE_STORAGE
+# environment variable, "text" or "sqlite"; `python main.py migrate` copies the text
+# files into the SQLite database.
+#
+# Rows cross the interface as ledger lines ("date,type,category,amount_paisa,description")
+# on the way in and as iter_rows() tuples (date_str, date_ordinal, type, category,
+# amount_paisa, description) on the way out, so imports can fingerprint lines the same
+# way whichever backend stores them.
+
+import os
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from utils.aggregate import top_expense_rows
+from utils.ledger import BUDGETS_FILE, TRANSACTIONS_FILE, iter_rows, load_budgets, load_ledger, save_budgets, update_budget
+from utils.locking import append_text, append_unlocked, file_lock
+from utils.rollups import ROLLUPS_FILE, load_rollups, month_totals, recent_rows, update_rollups
+
+SQLITE_FILE = "database/finance.db"
+
+STORAGE_ENV = "FINANCE_STORAGE"
+STORAGE_BACKENDS = ["text", "sqlite"]
+
+
+def month_bounds(key):
+    """Returns the [start, end) day ordinals of a 'YYYY-MM' month."""
+    year, month = int(key[:4]), int(key[5:7])
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return date(year, month, 1).toordinal(), end.toordinal()
+
+
+def _new_line_flags(fingerprints, stored):
+    """Flags (1 or 0 per line) the fingerprints that are neither in `stored` nor repeated
+    earlier in the batch."""
+    seen = set()
+    flags = bytearray(len(fingerprints))
+    for i, value in enumerate(fingerprints):
+        if value not in seen and value not in stored:
+            flags[i] = 1
+        seen.add(value)
+    return flags
+
+
+def _sidecar_path(transactions_path, default, suffix):
+    """Returns the standard sidecar path for the standard ledger, and `<ledger stem><suffix>`
+    beside any other, so two ledgers never share a sidecar."""
+    if transactions_path == TRANSACTIONS_FILE:
+        return default
+    return os.path.splitext(transactions_path)[0] + suffix
+
+
+def transaction_record(row):
+    """Returns an iter_rows() tuple as a transaction dict, dated with a datetime."""
+    _, date_ordinal, type, category, amount_paisa, description = row
+    return {"date": datetime.fromordinal(date_ordinal), "type": type, "category": category,
+            "amount_paisa": amount_paisa, "description": description}
+
+
+class Storage(ABC):
+    """Operations every storage backend provides.
+
+    Dates are day ordinals and ranges are [start, end), with None leaving a side open.
+    A backend that leaves any abstract method out fails when it is instantiated.
+    """
+
+    name = None
+
+    @abstractmethod
+    def append(self, lines, fsync=False):
+        """Appends ledger lines (each ending in a newline) as one write, optionally synced to disk."""
+
+    @abstractmethod
+    def append_new(self, lines, fingerprints, fsync=False):
+        """Appends, as one write, the ledger lines whose fingerprints are not stored yet
+        (nor repeated earlier in `lines`); returns a bytearray flagging the lines added.
+
+        The stored fingerprints are re-read after the write lock is taken and the lines
+        appended before it is released, so overlapping imports never add a line twice.
+        """
+
+    @abstractmethod
+    def count(self):
+        """Returns the number of stored transactions."""
+
+    def is_empty(self):
+        """Whether no transactions are stored; cheaper than count() on some backends."""
+        return not self.count()
+
+    @abstractmethod
+    def scan(self, start=None, end=None):
+        """Yields the rows dated in [start, end) as iter_rows() tuples, in the order they were added."""
+
+    @abstractmethod
+    def newest(self, start=None, type=None):
+        """Returns (total, rows): how many rows are dated on or after `start` (and have
+        `type`, if given), and an iterator over them newest day first, in the order they
+        were added within a day. Rows are read as the iterator is consumed."""
+
+    @abstractmethod
+    def month_totals(self, key):
+        """Returns {type: {category: amount_paisa}} for a 'YYYY-MM' month, always with 'income' and 'expense'."""
+
+    @abstractmethod
+    def type_total(self, type, start=None, end=None):
+        """Returns the sum of the amounts of `type` dated in [start, end)."""
+
+    @abstractmethod
+    def top_expenses(self, month_keys, top_n):
+        """Returns {month_key: [(row_id, record)]}: each month's `top_n` largest expenses,
+        largest first and in the order they were added among equal amounts. Row ids
+        increase in the order rows were added."""
+
+    @abstractmethod
+    def fingerprints(self):
+        """Returns the fingerprints of every stored line as a utils.fingerprints.Fingerprints
+        (a sorted array at 8 bytes a line), for import de-duplication."""
+
+    @abstractmethod
+    def load_budgets(self):
+        """Returns every budget as a {category: amount_paisa} dict."""
+
+    @abstractmethod
+    def set_budget(self, category, amount_paisa):
+        """Sets one category's budget, keeping the others."""
+
+    @abstractmethod
+    def save_budgets(self, budgets):
+        """Replaces every budget with a {category: amount_paisa} dict."""
+
+
+class TextStorage(Storage):
+    """The transactions and budgets text files, with their rollups and fingerprints sidecars."""
+
+    name = "text"
+
+    def __init__(self, path=TRANSACTIONS_FILE, budgets_path=BUDGETS_FILE):
+        self.path = path
+        self.budgets_path = budgets_path
+        self.rollups_path = _sidecar_path(path, ROLLUPS_FILE, ".rollups.json")
+
+    def append(self, lines, fsync=False):
+        append_text(self.path, "".join(lines), fsync=fsync)
+        update_rollups(self.rollups_path, self.path)
+
+    def append_new(self, lines, fingerprints, fsync=False):
+        with file_lock(self.path):
+            flags = _new_line_flags(fingerprints, self.fingerprints())
+            append_unlocked(self.path, "".join(line for line, flag in zip(lines, flags) if flag), fsync)
+        update_rollups(self.rollups_path, self.path)
+        return flags
+
+    def count(self):
+        return load_rollups(self.rollups_path, self.path)["rows"]
+
+    def scan(self, start=None, end=None):
+        if not os.path.exists(self.path):
+            return
+        for row in iter_rows(self.path):
+            if (start is None or row[1] >= start) and (end is None or row[1] < end):
+                yield row
+
+    def newest(self, start=None, type=None):
+        if type is None and start is not None:
+            # A recent window: read backwards from the end of the file
+            rows = recent_rows(start, path=self.rollups_path, transactions_path=self.path)
+            return len(rows), iter(rows)
+        ledger = load_ledger(self.path)
+        indices = ledger.newest_indices(start)
+        if type is None:
+            return len(ledger), (self._row(ledger, i) for i in indices)
+        code = ledger.type_code(type)
+        if code is None:
+            return 0, iter(())
+        types = ledger.types
+        total = types.count(code) if start is None else sum(1 for i in ledger.range_indices(start) if types[i] == code)
+        return total, (self._row(ledger, i) for i in indices if types[i] == code)
+
+    @staticmethod
+    def _row(ledger, i):
+        date_ordinal = ledger.dates[i]
+        return (
+            date.fromordinal(date_ordinal).isoformat(), date_ordinal, ledger.type_names[ledger.types[i]],
+            ledger.category_names[ledger.categories[i]], ledger.amounts[i],
+            ledger.description_pool[ledger.descriptions[i]],
+        )
+
+    def month_totals(self, key):
+        return month_totals(key, self.rollups_path, self.path)
+
+    def type_total(self, type, start=None, end=None):
+        ledger = load_ledger(self.path)
+        code = ledger.type_code(type)
+        if code is None:
+            return 0
+        types, amounts = ledger.types, ledger.amounts
+        return sum(amounts[i] for i in ledger.range_indices(start, end) if types[i] == code)
+
+    def top_expenses(self, month_keys, top_n):
+        ledger = load_ledger(self.path)
+        bounds = [month_bounds(key) + (key,) for key in month_keys]
+        return {
+            key: [(i, ledger.record(i)) for i in rows]
+            for key, rows in top_expense_rows(ledger, bounds, top_n).items()
+        }
+
+    def fingerprints(self):
+        # Only imports need fingerprints (and hashlib), so everyday commands skip loading them
+        from utils.fingerprints import FINGERPRINTS_FILE, load_fingerprints
+        return load_fingerprints(_sidecar_path(self.path, FINGERPRINTS_FILE, ".fingerprints.bin"), self.path)
+
+    def load_budgets(self):
+        return load_budgets(self.budgets_path)
+
+    def set_budget(self, category, amount_paisa):
+        update_budget(category, amount_paisa, self.budgets_path)
+
+    def save_budgets(self, budgets):
+        save_budgets(budgets, self.budgets_path)
+
+
+_storages = {}
+
+
+def get_storage(name=None):
+    """Returns the storage backend named by `name` or FINANCE_STORAGE ("text" by default).
+
+    Raises ValueError for an unknown backend name.
+    """
+    name = name or os.environ.get(STORAGE_ENV) or "text"
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}'. Choose from: {', '.join(STORAGE_BACKENDS)}.")
+    storage = _storages.get(name)
+    if storage is None:
+        if name == "sqlite":
+            # Only the SQLite backend needs sqlite3
+            from utils.sqlite_storage import SQLiteStorage
+            storage = SQLiteStorage()
+        else:
+            storage = TextStorage()
+        _storages[name] = storage
+    return storage
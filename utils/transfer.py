@@ -0,0 +1,95 @@
+# utils/transfer.py
+#
+# Streaming readers and writers shared by the CLI and dashboard imports/exports.
+# Each stage works one record at a time, so memory does not grow with the file.
+
+import csv
+import json
+from datetime import date
+
+EXPORT_FIELDS = ["date", "type", "category", "amount_paisa", "description"]
+
+
+def export_records(rows):
+    """Turns ledger rows into export dicts, normalising dates to YYYY-MM-DD."""
+    for date_str, date_ordinal, type, category, amount_paisa, description in rows:
+        if len(date_str) != 10:
+            date_str = date.fromordinal(date_ordinal).isoformat()
+        yield {
+            "date": date_str, "type": type, "category": category,
+            "amount_paisa": amount_paisa, "description": description
+        }
+
+
+def write_csv(records, f):
+    """Writes records as CSV row by row; returns the number written."""
+    writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    count = 0
+    for record in records:
+        writer.writerow(record)
+        count += 1
+    return count
+
+
+def write_json(records, f):
+    """Writes records as an indented JSON array one element at a time; returns the number written.
+
+    The output matches json.dump(list(records), f, indent=4).
+    """
+    count = 0
+    encode = json.dumps # Plain strings and ints go through the C encoder; indent=4 would not
+    for record in records:
+        f.write(",\n    {\n" if count else "[\n    {\n")
+        f.write(",\n".join(f"        {encode(field)}: {encode(record[field])}" for field in EXPORT_FIELDS))
+        f.write("\n    }")
+        count += 1
+    f.write("\n]" if count else "[]")
+    return count
+
+
+def iter_json_array(f, chunk_size=64 * 1024):
+    """Yields the elements of a top-level JSON array, reading `chunk_size` characters at a time."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def peek():
+        """Skips whitespace and returns the next character, or "" at the end of the file."""
+        nonlocal buf, pos, eof
+        while True:
+            while pos < len(buf) and buf[pos].isspace():
+                pos += 1
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            buf, pos = f.read(chunk_size), 0
+            eof = not buf
+
+    if peek() != "[":
+        raise json.JSONDecodeError("Expected a JSON array", buf, pos)
+    pos += 1
+    if peek() == "]":
+        return
+    while True:
+        peek()
+        while True:
+            # An element is complete once something follows it (or the file ends)
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                if end < len(buf) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            chunk = f.read(chunk_size)
+            buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+        pos = end
+        yield value
+
+        separator = peek()
+        pos += 1
+        if separator == "]":
+            if peek():
+                raise json.JSONDecodeError("Extra data", buf, pos)
+            return
+        if separator != ",":
+            raise json.JSONDecodeError("Expected ',' or ']'", buf, pos - 1)